@@ -0,0 +1,90 @@
+"""
+Awaitable variants of the base64 fields, for async views.
+
+Decoding, image verification and the file reads of representations run
+in an executor, so the event loop is free to serve other requests
+meanwhile. The executor is the `executor` argument or the
+`DRF_EXTRA_FIELDS_EXECUTOR` setting. Process pools can't run bound
+methods, so the default executor of the loop is used in their place.
+"""
+
+import functools
+
+from django.utils import six
+
+from rest_framework.fields import empty
+
+from . import fields
+from .compat import asyncio, futures
+
+
+def run_in_executor(executor, func, *args, **kwargs):
+    """
+    Return a future of the result of `func` run in an executor.
+    """
+    executor = fields.get_executor(executor)
+    if futures is not None and isinstance(executor, futures.ProcessPoolExecutor):
+        executor = None
+    loop = asyncio.get_event_loop()
+    return loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+
+def force_representation(representation):
+    """
+    Encode lazy base64 representations in place, so rendering doesn't block.
+    """
+    if isinstance(representation, fields.Base64Representation):
+        return six.text_type(representation)
+    if isinstance(representation, dict):
+        for key, value in list(representation.items()):
+            representation[key] = force_representation(value)
+    elif isinstance(representation, list):
+        for index, value in enumerate(representation):
+            representation[index] = force_representation(value)
+    return representation
+
+
+def ais_valid(serializer, raise_exception=False, executor=None):
+    """
+    Validate a serializer with base64 fields without blocking the loop.
+    """
+    return run_in_executor(
+        executor, serializer.is_valid, raise_exception=raise_exception)
+
+
+def adata(serializer, executor=None):
+    """
+    Represent a serializer with base64 fields without blocking the loop.
+    """
+    return run_in_executor(
+        executor, lambda: force_representation(serializer.data))
+
+
+class AsyncFieldMixin(fields.ExecutorMixin):
+    """
+    Add awaitable `arun_validation`, `ato_internal_value` and
+    `ato_representation` methods.
+    """
+
+    def arun_validation(self, data=empty):
+        return run_in_executor(self.executor, self.run_validation, data)
+
+    def ato_internal_value(self, data):
+        return run_in_executor(self.executor, self.to_internal_value, data)
+
+    def ato_representation(self, value):
+        return run_in_executor(
+            self.executor,
+            lambda: force_representation(self.to_representation(value)))
+
+
+class AsyncBase64ImageField(AsyncFieldMixin, fields.Base64ImageField):
+    pass
+
+
+class AsyncHybridImageField(AsyncFieldMixin, fields.HybridImageField):
+    pass
+
+
+class AsyncBase64FileField(AsyncFieldMixin, fields.Base64FileField):
+    pass
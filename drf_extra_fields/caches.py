@@ -0,0 +1,96 @@
+"""
+Caches for the encoded representations of stored files.
+"""
+
+import collections
+import threading
+
+from django.core import cache as django_cache
+
+
+class RepresentationCache(object):
+    """
+    Common support for counting cache hits and misses.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def count(self, value):
+        """
+        Count a lookup as a hit or a miss and return its value.
+        """
+        with self.lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def get(self, key):
+        raise NotImplementedError('`get()` must be implemented.')
+
+    def set(self, key, value):
+        raise NotImplementedError('`set()` must be implemented.')
+
+
+class LRUCache(RepresentationCache):
+    """
+    An in-process cache evicting the least recently used values.
+
+    Values are evicted once their total length exceeds `max_size`, and
+    values longer than that are never cached.
+    """
+
+    def __init__(self, max_size=32 * 1024 * 1024):
+        super(LRUCache, self).__init__()
+        self.max_size = max_size
+        self.size = 0
+        self.values = collections.OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            value = self.values.pop(key, None)
+            if value is not None:
+                # Move to the most recently used end
+                self.values[key] = value
+        return self.count(value)
+
+    def set(self, key, value):
+        if len(value) > self.max_size:
+            return
+        with self.lock:
+            previous = self.values.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self.values[key] = value
+            self.size += len(value)
+            while self.size > self.max_size:
+                evicted_key, evicted = self.values.popitem(last=False)
+                self.size -= len(evicted)
+
+
+class DjangoCache(RepresentationCache):
+    """
+    Cache values in one of the Django `CACHES` by alias.
+    """
+
+    def __init__(self, alias=django_cache.DEFAULT_CACHE_ALIAS, timeout=None):
+        super(DjangoCache, self).__init__()
+        self.alias = alias
+        self.timeout = timeout
+
+    @property
+    def cache(self):
+        return django_cache.caches[self.alias]
+
+    def get(self, key):
+        return self.count(self.cache.get(key))
+
+    def set(self, key, value):
+        if self.timeout is None:
+            self.cache.set(key, value)
+        else:
+            self.cache.set(key, value, self.timeout)
@@ -4,3 +4,35 @@ try:
     from psycopg2.extras import DateRange, DateTimeTZRange, NumericRange
 except ImportError:
     postgres_fields = DateRange = DateTimeTZRange = NumericRange = None
+
+# The abstract base classes moved to collections.abc in Python 3.3 and are
+# only there from Python 3.10 onwards.
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping  # noqa
+
+# concurrent.futures is only in the standard library from Python 3.2 onwards.
+try:
+    from concurrent import futures
+except ImportError:
+    futures = None
+
+# asyncio is only in the standard library from Python 3.4 onwards.
+try:
+    import asyncio
+except ImportError:
+    asyncio = None
+
+# NumPy is optional, it vectorizes the validation of numeric range bounds.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# fcntl is only available on Unix, elsewhere uploads are only locked
+# between the threads of a process.
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
@@ -1,13 +1,38 @@
 import base64
 import binascii
-import imghdr
+import datetime
+import functools
+import hashlib
+import io
+import itertools
+import mimetypes
+import os
+import pickle
+import posixpath
+import tarfile
+import threading
 import uuid
+import zipfile
+import zlib
 
+from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.core.files.base import ContentFile
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import (
+    InMemoryUploadedFile,
+    TemporaryUploadedFile,
+)
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db.models.fields.files import FieldFile, ImageFieldFile
 from django.utils import six
+from django.utils.encoding import python_2_unicode_compatible
+from django.utils.functional import Promise
+from django.utils.module_loading import import_string
+from django.utils.text import get_valid_filename
 from django.utils.translation import ugettext_lazy as _
 
+from rest_framework import exceptions
 from rest_framework.fields import (
     DateField,
     DateTimeField,
@@ -16,17 +41,238 @@ from rest_framework.fields import (
     FloatField,
     ImageField,
     IntegerField,
+    ListField,
+    empty,
+    get_error_detail,
 )
 from rest_framework.utils import html
+from . import ranges
+from . import renditions as renditions_module
+from . import signatures
 from .compat import (
     DateRange,
     DateTimeTZRange,
+    Mapping,
     NumericRange,
+    futures,
+    numpy,
     postgres_fields,
 )
 
 
 DEFAULT_CONTENT_TYPE = "application/octet-stream"
+# Storage attributes telling apart where storages of a class keep files.
+STORAGE_KEY_ATTRIBUTES = ('location', 'bucket_name', 'azure_container')
+# Raw file contents from binary parsers, byte strings are base64 on Python 2.
+BINARY_TYPES = (bytearray, memoryview) + ((bytes,) if six.PY3 else ())
+# Number of base64 characters decoded at a time, must be a multiple of 4.
+DEFAULT_DECODE_CHUNK_SIZE = 64 * 1024
+# Number of bytes read at a time to encode, must be a multiple of 3.
+DEFAULT_ENCODE_CHUNK_SIZE = 48 * 1024
+# Guards the decoded size budget of fields validated concurrently.
+budget_lock = threading.Lock()
+
+
+def b64decode_chunks(base64_data, chunk_size=DEFAULT_DECODE_CHUNK_SIZE):
+    """
+    Decode a base64 string incrementally, yielding the decoded bytes.
+
+    Whitespace such as MIME line breaks is skipped, so slices are
+    re-aligned on 4 character boundaries before being decoded.
+    """
+    remainder = ''
+    for start in six.moves.range(0, len(base64_data), chunk_size):
+        chunk = remainder + ''.join(
+            base64_data[start:start + chunk_size].split())
+        cut = len(chunk) - len(chunk) % 4
+        remainder = chunk[cut:]
+        if cut:
+            yield base64.b64decode(chunk[:cut])
+    if remainder:
+        # Let the decoder complain about the missing padding.
+        yield base64.b64decode(remainder)
+
+
+def b64decoded_size(base64_data):
+    """
+    Compute the decoded size of a base64 string without decoding it.
+
+    This is exact for unwrapped base64 and an upper bound otherwise.
+    """
+    length = len(base64_data)
+    return length * 3 // 4 - base64_data.count('=', max(length - 2, 0))
+
+
+def b64decode_prefix(base64_data, size):
+    """
+    Decode only as much of a base64 string as needed for `size` leading bytes.
+    """
+    length = -(-size // 3) * 4
+    window = base64_data[:length * 2]
+    prefix = ''.join(window.split())
+    if len(window) < len(base64_data):
+        prefix = prefix[:length]
+        prefix = prefix[:len(prefix) - len(prefix) % 4]
+    # Short payloads are decoded whole, so malformed ones are reported here.
+    return base64.b64decode(prefix)[:size]
+
+
+def b64encode_chunks(file, chunk_size=DEFAULT_ENCODE_CHUNK_SIZE):
+    """
+    Encode an open file to base64 incrementally, yielding the encoded text.
+
+    Reads may be short, so bytes beyond a multiple of 3 are carried over to
+    the next chunk and only the last one is padded.
+    """
+    leftover = b''
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            break
+        chunk = leftover + chunk
+        end = len(chunk) - len(chunk) % 3
+        leftover = chunk[end:]
+        if end:
+            yield base64.b64encode(chunk[:end]).decode()
+    if leftover:
+        yield base64.b64encode(leftover).decode()
+
+
+def hash_chunks(chunks, digest):
+    """
+    Feed byte chunks to a hashlib digest as they go by.
+    """
+    for chunk in chunks:
+        digest.update(chunk)
+        yield chunk
+
+
+def spool_chunks(chunks, name, max_memory_size=None):
+    """
+    Write byte chunks to an uploaded file, rolling over to disk when large.
+
+    Contents stay in memory until they exceed `max_memory_size`, which
+    defaults to the `FILE_UPLOAD_MAX_MEMORY_SIZE` setting, and are moved to
+    a `TemporaryUploadedFile` beyond that, like Django's upload handlers do.
+    """
+    if max_memory_size is None:
+        max_memory_size = settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+    spooled = io.BytesIO()
+    size = 0
+    for chunk in chunks:
+        size += len(chunk)
+        if not isinstance(spooled, TemporaryUploadedFile) and size > max_memory_size:
+            temporary = TemporaryUploadedFile(name, DEFAULT_CONTENT_TYPE, 0, None)
+            temporary.write(spooled.getvalue())
+            spooled = temporary
+        spooled.write(chunk)
+
+    if isinstance(spooled, TemporaryUploadedFile):
+        spooled.size = size
+        spooled.flush()
+    else:
+        spooled = InMemoryUploadedFile(
+            spooled, None, name, DEFAULT_CONTENT_TYPE, size, None)
+    spooled.seek(0)
+    return spooled
+
+
+class StreamedFile(object):
+    """
+    A read-once file over byte chunks, saved to storage as they are produced.
+
+    Storages writing `chunks()` get them one at a time, those reading the
+    file get as many chunks as `read()` needs.
+    """
+
+    def __init__(self, chunks, name=None, size=None):
+        self.name = name
+        self.size = size
+        self.iterator = iter(chunks)
+        self.buffer = b''
+        self.position = 0
+
+    def read(self, size=-1):
+        pieces = [self.buffer]
+        length = len(self.buffer)
+        for chunk in self.iterator:
+            pieces.append(chunk)
+            length += len(chunk)
+            if 0 <= size <= length:
+                break
+        data = b''.join(pieces)
+        if size < 0:
+            size = len(data)
+        data, self.buffer = data[:size], data[size:]
+        self.position += len(data)
+        return data
+
+    def chunks(self, chunk_size=None):
+        if self.buffer:
+            buffer, self.buffer = self.buffer, b''
+            self.position += len(buffer)
+            yield buffer
+        for chunk in self.iterator:
+            self.position += len(chunk)
+            yield chunk
+
+    def multiple_chunks(self, chunk_size=None):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, position, whence=os.SEEK_SET):
+        # Storages rewind files before saving them, which is all we allow.
+        if position != self.position or whence != os.SEEK_SET:
+            raise io.UnsupportedOperation('StreamedFile can only be read once.')
+        return self.position
+
+    def close(self):
+        pass
+
+
+class CommittedFileMixin(object):
+    """
+    A file already written to storage, which model fields won't save again.
+
+    Once assigned to a model file field, the field's storage is used, so it
+    should be the one the file was written to.
+    """
+
+    def __init__(self, storage, name):
+        File.__init__(self, None, name)
+        self.instance = None
+        self.storage = storage
+        self._committed = True
+
+
+class CommittedFile(CommittedFileMixin, FieldFile):
+    pass
+
+
+class CommittedImageFile(CommittedFileMixin, ImageFieldFile):
+    pass
+
+
+@python_2_unicode_compatible
+class Base64Representation(Promise):
+    """
+    The base64 representation of a stored file, encoded only when rendered.
+
+    Streaming renderers can write `chunks()` as they are encoded, others
+    render it as a string like any lazy translation.
+    """
+
+    def __init__(self, field, file):
+        self.field = field
+        self.file = file
+
+    def chunks(self):
+        return self.field.iter_representation(self.file)
+
+    def __str__(self):
+        return ''.join(self.chunks())
 
 
 class Base64FieldMixin(object):
@@ -34,9 +280,60 @@ class Base64FieldMixin(object):
     INVALID_FILE_MESSAGE = NotImplemented
     INVALID_TYPE_MESSAGE = NotImplemented
     EMPTY_VALUES = (None, '', [], (), {})
+    # Number of leading decoded bytes given to `sniff_file_extension`,
+    # defaults to the longest signature in `signature_registry`.
+    SNIFF_SIZE = None
+    TOO_LARGE_MESSAGE = _("The file may not be larger than {max_size} bytes.")
+    BUDGET_EXCEEDED_MESSAGE = _(
+        "The files in this request may not be larger than {max_size} bytes in total.")
+    # Serializer context key overriding the per request size budget
+    BUDGET_CONTEXT_KEY = 'max_total_decoded_size'
+
+    signature_registry = signatures.registry
+    stream_decoding = False
+    decode_chunk_size = DEFAULT_DECODE_CHUNK_SIZE
+    max_memory_size = None
+    max_decoded_size = None
+    lazy_representation = False
+    representation_cache = None
+    inline_max_size = None
+    data_uri = False
+    content_addressed = False
+    hash_algorithm = 'sha256'
+    storage = None
+    upload_to = ''
+    stream_to_storage = False
+    committed_file_class = CommittedFile
 
     def __init__(self, *args, **kwargs):
         self.represent_in_base64 = kwargs.pop('represent_in_base64', False)
+        self.signature_registry = kwargs.pop(
+            'signature_registry', self.signature_registry)
+        self.stream_decoding = kwargs.pop(
+            'stream_decoding', self.stream_decoding)
+        self.decode_chunk_size = kwargs.pop(
+            'decode_chunk_size', self.decode_chunk_size)
+        self.max_memory_size = kwargs.pop(
+            'max_memory_size', self.max_memory_size)
+        self.max_decoded_size = kwargs.pop(
+            'max_decoded_size', self.max_decoded_size)
+        self.lazy_representation = kwargs.pop(
+            'lazy_representation', self.lazy_representation)
+        self.representation_cache = kwargs.pop(
+            'representation_cache', self.representation_cache)
+        self.inline_max_size = kwargs.pop(
+            'inline_max_size', self.inline_max_size)
+        self.data_uri = kwargs.pop('data_uri', self.data_uri)
+        self.content_addressed = kwargs.pop(
+            'content_addressed', self.content_addressed)
+        self.storage = kwargs.pop('storage', self.storage)
+        self.upload_to = kwargs.pop('upload_to', self.upload_to)
+        self.stream_to_storage = kwargs.pop(
+            'stream_to_storage', self.stream_to_storage)
+        assert not (self.stream_to_storage and self.content_addressed), (
+            '`stream_to_storage` and `content_addressed` can\'t be combined.')
+        assert self.decode_chunk_size > 0 and not self.decode_chunk_size % 4, (
+            '`decode_chunk_size` must be a positive multiple of 4.')
         super(Base64FieldMixin, self).__init__(*args, **kwargs)
 
     def to_internal_value(self, base64_data):
@@ -44,37 +341,377 @@ class Base64FieldMixin(object):
         if base64_data in self.EMPTY_VALUES:
             return None
 
+        if isinstance(base64_data, BINARY_TYPES):
+            return self.to_internal_value_binary(base64_data)
+
         if isinstance(base64_data, six.string_types):
             # Strip base64 header.
             if ';base64,' in base64_data:
                 header, base64_data = base64_data.split(';base64,')
 
-            # Try to decode the file. Return validation error if it fails.
+            self.check_decoded_size(b64decoded_size(base64_data))
+
+            # Reject unwanted types before decoding the whole file.
             try:
-                decoded_file = base64.b64decode(base64_data)
-            except (TypeError, binascii.Error):
+                file_header = b64decode_prefix(base64_data, self.get_sniff_size())
+            except (TypeError, ValueError, binascii.Error):
                 raise ValidationError(self.INVALID_FILE_MESSAGE)
+            self.check_file_header(file_header)
+
             # Generate file name:
             file_name = str(uuid.uuid4())[:12]  # 12 characters are more than enough.
-            # Get the file name extension:
-            file_extension = self.get_file_extension(file_name, decoded_file)
+            if self.stream_to_storage:
+                return self.to_internal_value_stored(base64_data, file_header, file_name)
+            if self.stream_decoding:
+                return self.to_internal_value_streamed(base64_data, file_name)
+
+            # Try to decode the file. Return validation error if it fails.
+            try:
+                decoded_file = base64.b64decode(base64_data)
+            except (TypeError, ValueError, binascii.Error):
+                raise ValidationError(self.INVALID_FILE_MESSAGE)
+            return self.to_internal_value_decoded(decoded_file, file_name)
+        raise ValidationError(_('This is not an base64 string'))
+
+    def to_internal_value_binary(self, decoded_file):
+        """
+        Take raw bytes from binary parsers as they are, without base64.
+        """
+        decoded_file = memoryview(decoded_file)
+        if decoded_file.ndim != 1 or decoded_file.itemsize != 1:
+            decoded_file = memoryview(decoded_file.tobytes())
+        self.check_decoded_size(len(decoded_file))
+        self.check_file_header(decoded_file[:self.get_sniff_size()].tobytes())
+        source = getattr(decoded_file, 'obj', None)
+        if isinstance(source, bytes) and len(source) == len(decoded_file):
+            # Use the underlying bytes, which file buffers share without copying.
+            decoded_file = source
+        else:
+            decoded_file = decoded_file.tobytes()
+        return self.to_internal_value_decoded(decoded_file, str(uuid.uuid4())[:12])
+
+    def to_internal_value_decoded(self, decoded_file, file_name):
+        """
+        Name and validate the decoded bytes of a file.
+        """
+        # Get the file name extension:
+        file_extension = self.get_file_extension(file_name, decoded_file)
+        if file_extension not in self.ALLOWED_TYPES:
+            raise ValidationError(self.INVALID_TYPE_MESSAGE)
+        complete_file_name = file_name + "." + file_extension
+        data = ContentFile(decoded_file, name=complete_file_name)
+        digest = None
+        if self.content_addressed:
+            digest = hashlib.new(self.hash_algorithm, decoded_file)
+        return self.save_file(self.validate_file(data), digest)
+
+    def get_sniff_size(self):
+        return self.SNIFF_SIZE or self.signature_registry.max_length
+
+    def check_file_header(self, file_header):
+        """
+        Reject files whose header tells a type that isn't allowed.
+        """
+        sniffed_extension = self.sniff_file_extension(file_header)
+        if sniffed_extension is not None and sniffed_extension not in self.ALLOWED_TYPES:
+            raise ValidationError(self.INVALID_TYPE_MESSAGE)
+
+    def get_total_decoded_size_budget(self):
+        """
+        Return the limit on the decoded size of all files in a request.
+
+        Taken from the serializer context or the
+        `DRF_EXTRA_FIELDS_MAX_TOTAL_DECODED_SIZE` setting.
+        """
+        return self.context.get(
+            self.BUDGET_CONTEXT_KEY,
+            getattr(settings, 'DRF_EXTRA_FIELDS_MAX_TOTAL_DECODED_SIZE', None))
+
+    def check_decoded_size(self, size):
+        """
+        Enforce the field limit and charge the budget shared by the serializer.
+        """
+        if self.max_decoded_size is not None and size > self.max_decoded_size:
+            raise ValidationError(
+                self.TOO_LARGE_MESSAGE.format(max_size=self.max_decoded_size))
+
+        budget = self.get_total_decoded_size_budget()
+        if budget is None:
+            return
+        # All fields of a serializer tree share the same root.
+        root = self.root
+        with budget_lock:
+            total = getattr(root, '_base64_decoded_size', 0) + size
+            if total > budget:
+                raise ValidationError(
+                    self.BUDGET_EXCEEDED_MESSAGE.format(max_size=budget))
+            root._base64_decoded_size = total
+
+    def get_decoded_size(self, data):
+        """
+        Tell the decoded size of a base64 string or raw binary value.
+        """
+        if isinstance(data, BINARY_TYPES):
+            view = memoryview(data)
+            if view.ndim == 1:
+                return len(view) * view.itemsize
+            return len(view.tobytes())
+        if isinstance(data, six.string_types):
+            return b64decoded_size(data.split(';base64,')[-1])
+        return None
+
+    def to_internal_value_streamed(self, base64_data, file_name):
+        """
+        Decode in chunks into a spooled file instead of one large buffer.
+
+        `get_file_extension` is given the spooled file object rather than
+        the decoded bytes.
+        """
+        chunks = b64decode_chunks(base64_data, self.decode_chunk_size)
+        digest = None
+        if self.content_addressed:
+            digest = hashlib.new(self.hash_algorithm)
+            chunks = hash_chunks(chunks, digest)
+        try:
+            data = spool_chunks(chunks, file_name, self.max_memory_size)
+        except (TypeError, ValueError, binascii.Error):
+            raise ValidationError(self.INVALID_FILE_MESSAGE)
+        file_extension = self.get_file_extension(file_name, data)
+        data.seek(0)
+        if file_extension not in self.ALLOWED_TYPES:
+            data.close()
+            raise ValidationError(self.INVALID_TYPE_MESSAGE)
+        data.name = file_name + "." + file_extension
+        return self.save_file(self.validate_file(data), digest)
+
+    def to_internal_value_stored(self, base64_data, file_header, file_name):
+        """
+        Decode in chunks straight into storage and validate the stored file.
+
+        The stored name takes its extension from the file header. Files
+        failing validation are deleted from storage again.
+        """
+        extension = self.sniff_file_extension(file_header)
+        if extension is None:
+            extension = self.detect_file_extension(file_header)
+        if extension:
+            file_name += "." + extension
+        storage = self.get_storage()
+        chunks = b64decode_chunks(base64_data, self.decode_chunk_size)
+        try:
+            name = self.save_chunks(
+                storage, posixpath.join(self.upload_to, file_name), chunks,
+                b64decoded_size(base64_data))
+        except (TypeError, ValueError, binascii.Error):
+            raise ValidationError(self.INVALID_FILE_MESSAGE)
+
+        data = self.committed_file_class(storage, name)
+        try:
+            file_extension = self.get_file_extension(file_name, data)
+            data.seek(0)
             if file_extension not in self.ALLOWED_TYPES:
                 raise ValidationError(self.INVALID_TYPE_MESSAGE)
-            complete_file_name = file_name + "." + file_extension
-            data = ContentFile(decoded_file, name=complete_file_name)
-            return super(Base64FieldMixin, self).to_internal_value(data)
-        raise ValidationError(_('This is not an base64 string'))
+            data = self.validate_file(data)
+        except Exception:
+            data.close()
+            storage.delete(name)
+            raise
+        data.close()
+        return data
+
+    def save_chunks(self, storage, name, chunks, size=None):
+        """
+        Save byte chunks to storage as they come and return the stored name.
+
+        Whatever was written is deleted again if the chunks fail.
+        """
+        name = storage.get_available_name(name)
+        try:
+            return storage.save(name, StreamedFile(chunks, name, size))
+        except Exception:
+            if storage.exists(name):
+                storage.delete(name)
+            raise
+
+    def process_file(self, data):
+        """
+        Post-process a validated file, after all the ways of taking one.
+        """
+        return data
+
+    def validate_file(self, data):
+        """
+        Validate the decoded file as the parent upload field does.
+        """
+        return super(Base64FieldMixin, self).to_internal_value(data)
+
+    def get_storage(self):
+        return self.storage or default_storage
+
+    def save_file(self, data, digest=None):
+        """
+        Name content addressed files by digest and store them unless present.
+
+        With `stream_to_storage` files are stored under their own name.
+        """
+        if self.stream_to_storage:
+            storage = self.get_storage()
+            data.seek(0)
+            name = storage.save(posixpath.join(self.upload_to, data.name), data)
+            data.close()
+            return self.committed_file_class(storage, name)
+        if digest is None:
+            return data
+        storage = self.get_storage()
+        name = posixpath.join(
+            self.upload_to, digest.hexdigest() + os.path.splitext(data.name)[1])
+        if not storage.exists(name):
+            data.seek(0)
+            name = storage.save(name, data)
+        data.close()
+        return self.committed_file_class(storage, name)
+
+    def detect_file_extension(self, decoded_file):
+        """
+        Look up the extension of decoded bytes or a file in `signature_registry`.
+        """
+        signature = self.signature_registry.detect(decoded_file)
+        return signature.extension if signature is not None else None
+
+    def sniff_file_extension(self, file_header):
+        """
+        Return the extension told by the first `SNIFF_SIZE` decoded bytes.
+
+        `None` means the header is inconclusive and the type is left to
+        `get_file_extension` once the whole file is decoded. Headers are
+        only trusted by fields telling types by their signature, overrides
+        of `get_file_extension` may need the whole file.
+        """
+        if not self.detects_type_by_signature():
+            return None
+        return self.detect_file_extension(file_header)
+
+    def detects_type_by_signature(self):
+        return six.get_unbound_function(
+            type(self).get_file_extension) in SIGNATURE_EXTENSION_FUNCTIONS
 
     def get_file_extension(self, filename, decoded_file):
         raise NotImplemented
 
-    def to_representation(self, file):
-        if self.represent_in_base64:
+    def open_file(self, file):
+        """
+        Open a stored file through its storage, or its path otherwise.
+        """
+        storage = getattr(file, 'storage', None)
+        if storage is not None:
+            return storage.open(file.name, 'rb')
+        return open(file.path, 'rb')
+
+    def get_representation_cache_key(self, file):
+        """
+        Identify a stored file version by storage, name, size and mtime.
+        """
+        storage = getattr(file, 'storage', None)
+        if storage is not None:
             try:
-                with open(file.path, 'rb') as f:
-                    return base64.b64encode(f.read()).decode()
-            except Exception:
-                raise IOError("Error encoding file")
+                modified_time = storage.get_modified_time(file.name)
+            except AttributeError:  # pragma: no cover
+                # Django < 1.10
+                modified_time = storage.modified_time(file.name)
+            stat = (storage.size(file.name), modified_time)
+            storage = self.get_storage_key(storage)
+            name = file.name
+        else:
+            stat = os.stat(file.path)
+            stat = (stat.st_size, stat.st_mtime)
+            name = file.path
+        key = u'{0}:{1}:{2}:{3}'.format(storage, name, *stat)
+        return 'drf_extra_fields.base64:' + hashlib.md5(key.encode('utf-8')).hexdigest()
+
+    def get_storage_key(self, storage):
+        """
+        Tell storages apart by class and where they keep files, e.g. the
+        location of file system storages or the bucket of S3 ones.
+        """
+        parts = ['{0}.{1}'.format(type(storage).__module__, type(storage).__name__)]
+        for attribute in STORAGE_KEY_ATTRIBUTES:
+            value = getattr(storage, attribute, None)
+            if value is not None:
+                parts.append(u'{0}={1}'.format(attribute, value))
+        if hasattr(storage, 'deconstruct'):
+            path, args, kwargs = storage.deconstruct()
+            parts.extend(six.text_type(arg) for arg in args)
+            parts.extend(u'{0}={1}'.format(key, kwargs[key]) for key in sorted(kwargs))
+        return u'|'.join(parts)
+
+    def encode_file(self, file):
+        """
+        Read a stored file in chunks and yield it encoded in base64.
+
+        Encoded files are looked up in and added to `representation_cache`.
+        """
+        cache = self.representation_cache
+        try:
+            if cache is not None:
+                key = self.get_representation_cache_key(file)
+                cached = cache.get(key)
+                if cached is not None:
+                    yield cached
+                    return
+                chunks = []
+            with self.open_file(file) as f:
+                for chunk in b64encode_chunks(f):
+                    if cache is not None:
+                        chunks.append(chunk)
+                    yield chunk
+        except Exception:
+            raise IOError("Error encoding file")
+        if cache is not None:
+            cache.set(key, ''.join(chunks))
+
+    def get_file_size(self, file):
+        """
+        Return the size of a stored file from metadata, without opening it.
+        """
+        storage = getattr(file, 'storage', None)
+        if storage is not None:
+            return storage.size(file.name)
+        return os.path.getsize(file.path)
+
+    def get_content_type(self, file):
+        """
+        Guess the MIME type of a stored file from its name.
+        """
+        name = getattr(file, 'name', None) or file.path
+        extension = os.path.splitext(name)[1][1:].lower()
+        return (
+            self.signature_registry.get_mime_type(extension) or
+            mimetypes.guess_type(name)[0] or DEFAULT_CONTENT_TYPE)
+
+    def represents_inline(self, file):
+        """
+        Whether to inline a file in base64 rather than represent it as a URL.
+
+        With `inline_max_size` only files up to that size are inlined.
+        """
+        if self.inline_max_size is not None:
+            return self.get_file_size(file) <= self.inline_max_size
+        return self.represent_in_base64
+
+    def iter_representation(self, file):
+        """
+        Yield the base64 representation, as a data URI if configured.
+        """
+        if self.data_uri:
+            yield 'data:{0};base64,'.format(self.get_content_type(file))
+        for chunk in self.encode_file(file):
+            yield chunk
+
+    def to_representation(self, file):
+        if file and self.represents_inline(file):
+            if self.lazy_representation:
+                return Base64Representation(self, file)
+            return ''.join(self.iter_representation(file))
         else:
             return super(Base64FieldMixin, self).to_representation(file)
 
@@ -92,11 +729,296 @@ class Base64ImageField(Base64FieldMixin, ImageField):
     )
     INVALID_FILE_MESSAGE = _("Please upload a valid image.")
     INVALID_TYPE_MESSAGE = _("The type of the image couldn't be determined.")
+    TOO_MANY_PIXELS_MESSAGE = _("The image may not have more than {max_pixels} pixels.")
+    TOO_MANY_FRAMES_MESSAGE = _("The image may not have more than {max_frames} frames.")
+
+    fast_verify = False
+    max_pixels = None
+    max_frames = None
+    committed_file_class = CommittedImageFile
+    renditions = ()
+    defer_renditions = False
+    rendition_queue = None
+    rendition_upload_to = 'renditions'
+    metadata_fields = None
+    metadata_store = None
+
+    def __init__(self, *args, **kwargs):
+        self.fast_verify = kwargs.pop('fast_verify', self.fast_verify)
+        self.max_pixels = kwargs.pop('max_pixels', self.max_pixels)
+        self.max_frames = kwargs.pop('max_frames', self.max_frames)
+        self.renditions = kwargs.pop('renditions', self.renditions)
+        self.defer_renditions = kwargs.pop(
+            'defer_renditions', self.defer_renditions)
+        self.rendition_queue = kwargs.pop('rendition_queue', self.rendition_queue)
+        self.rendition_upload_to = kwargs.pop(
+            'rendition_upload_to', self.rendition_upload_to)
+        self.metadata_fields = kwargs.pop('metadata_fields', self.metadata_fields)
+        self.metadata_store = kwargs.pop('metadata_store', self.metadata_store)
+        super(Base64ImageField, self).__init__(*args, **kwargs)
+
+    def to_internal_value(self, base64_data):
+        return self.process_file(
+            super(Base64ImageField, self).to_internal_value(base64_data))
+
+    def process_file(self, data):
+        """
+        Extract the metadata of an image.
+
+        Renditions are only made once the image is saved, see `make_renditions`.
+        """
+        if data is None:
+            return data
+        if self.metadata_fields or self.metadata_store is not None:
+            data.metadata = self.get_metadata(data)
+            if self.metadata_store is not None:
+                self.metadata_store.set(self.get_metadata_key(data.name), data.metadata)
+        return data
+
+    def get_metadata(self, data):
+        """
+        Return the dimensions, format, size and digest of an image.
+        """
+        image = getattr(data, 'image', None)
+        if image is None:
+            image = self.open_image(data)
+        if self.content_addressed:
+            # Content addressed files are named by the same digest.
+            digest = posixpath.splitext(posixpath.basename(data.name))[0]
+        else:
+            digest = hashlib.new(self.hash_algorithm)
+            for chunk in data.chunks():
+                digest.update(chunk)
+            data.seek(0)
+            digest = digest.hexdigest()
+        width, height = image.size
+        return {
+            'width': width,
+            'height': height,
+            'format': image.format,
+            'size': data.size,
+            'digest': digest,
+        }
+
+    def get_metadata_key(self, name):
+        return 'drf_extra_fields.metadata:' + posixpath.basename(name)
+
+    def bind(self, field_name, parent):
+        super(Base64ImageField, self).bind(field_name, parent)
+        assert not self.metadata_fields or isinstance(parent, ImageSerializerMixin), (
+            '`metadata_fields` need the serializer to use `ImageSerializerMixin`.')
+
+    def get_attribute(self, instance):
+        """
+        Give stored images the metadata read back from `metadata_fields`.
+        """
+        file = super(Base64ImageField, self).get_attribute(instance)
+        if self.metadata_fields and file:
+            file.metadata = {
+                key: getattr(instance, attribute)
+                for key, attribute in six.iteritems(self.metadata_fields)}
+        return file
+
+    def get_metadata_attributes(self, value, model):
+        """
+        Map the `metadata_fields` attributes to the metadata of an image.
+
+        Without an image they get the empty value of their model field.
+        """
+        if value is None:
+            return {
+                attribute: model._meta.get_field(attribute).get_default()
+                for attribute in six.itervalues(self.metadata_fields)}
+        metadata = getattr(value, 'metadata', {})
+        return {
+            attribute: metadata.get(key)
+            for key, attribute in six.iteritems(self.metadata_fields)}
+
+    def get_stored_metadata(self, file):
+        """
+        Read the metadata of a stored image from where it was extracted to.
+        """
+        if self.metadata_fields:
+            return getattr(file, 'metadata', None)
+        if self.metadata_store is not None:
+            return self.metadata_store.get(self.get_metadata_key(file.name))
+        return None
+
+    def get_rendition_name(self, name, rendition):
+        """
+        Store the renditions of an image in a directory named after it.
+        """
+        base_name, extension = os.path.splitext(posixpath.basename(name))
+        return posixpath.join(
+            self.rendition_upload_to, base_name, '{0}.{1}'.format(
+                rendition.name, rendition.get_extension(extension[1:].lower())))
+
+    def make_renditions(self, file):
+        """
+        Render the renditions of a saved image now or queue them with
+        `defer_renditions`.
+
+        `ImageSerializerMixin` calls this once the instance is saved, so
+        renditions are named after the committed file in its own storage.
+        """
+        storage = getattr(file, 'storage', None) or self.get_storage()
+        if self.defer_renditions:
+            queue = self.rendition_queue or renditions_module.default_queue
+            queue.put(self.save_renditions, storage, file.name)
+        else:
+            self.save_renditions(storage, file.name)
+
+    def save_renditions(self, storage, name):
+        """
+        Render the renditions of a stored image into the same storage.
+        """
+        from PIL import Image
+
+        with storage.open(name, 'rb') as image_file:
+            content = image_file.read()
+        for rendition in self.renditions:
+            image = Image.open(io.BytesIO(content))
+            rendition_name = self.get_rendition_name(name, rendition)
+            rendered = ContentFile(rendition.render(image))
+            if storage.exists(rendition_name):
+                storage.delete(rendition_name)
+            storage.save(rendition_name, rendered)
+
+    def get_rendition_urls(self, file):
+        """
+        Map the names of the renditions of a stored image to their URLs.
+
+        Names are known from the name of the image, so storage isn't
+        accessed besides building the URLs.
+        """
+        storage = getattr(file, 'storage', None) or self.get_storage()
+        return {
+            rendition.name: storage.url(self.get_rendition_name(file.name, rendition))
+            for rendition in self.renditions}
+
+    def to_representation(self, value):
+        """
+        Give the URLs of the renditions and the metadata along the image.
+        """
+        file = value
+        representation = super(Base64ImageField, self).to_representation(file)
+        if not file:
+            return representation
+        extras = {}
+        if self.renditions:
+            extras['renditions'] = self.get_rendition_urls(file)
+        if self.metadata_fields or self.metadata_store is not None:
+            extras['metadata'] = self.get_stored_metadata(file)
+        if not extras:
+            return representation
+        extras['file'] = representation
+        return extras
+
+    def open_image(self, data):
+        """
+        Read the image header with Pillow without decoding the pixels.
+        """
+        from PIL import Image
+
+        if hasattr(data, 'temporary_file_path'):
+            image_file = data.temporary_file_path()
+        else:
+            image_file = data
+        try:
+            image = Image.open(image_file)
+        except Exception:
+            raise ValidationError(self.error_messages['invalid_image'])
+        finally:
+            data.seek(0)
+        return image
+
+    def count_frames(self, image, limit):
+        """
+        Count the frames of an image, seeking no further than `limit`.
+
+        Unlike `n_frames`, this doesn't decode every frame of long GIFs.
+        """
+        frames = 1
+        try:
+            while frames < limit:
+                image.seek(frames)
+                frames += 1
+        except EOFError:
+            pass
+        except Exception:
+            raise ValidationError(self.error_messages['invalid_image'])
+        finally:
+            image.seek(0)
+        return frames
+
+    def validate_file(self, data):
+        """
+        Check the image limits from its header before any full verification.
+
+        With `fast_verify` the full Pillow verification is skipped entirely.
+        """
+        if not self.fast_verify and self.max_pixels is None and self.max_frames is None:
+            return super(Base64ImageField, self).validate_file(data)
+
+        image = self.open_image(data)
+        width, height = image.size
+        if self.max_pixels is not None and width * height > self.max_pixels:
+            raise ValidationError(
+                self.TOO_MANY_PIXELS_MESSAGE.format(max_pixels=self.max_pixels))
+        if self.max_frames is not None:
+            frames = self.count_frames(image, self.max_frames + 1)
+            # Seeking frames reads on from the file.
+            data.seek(0)
+            if frames > self.max_frames:
+                raise ValidationError(
+                    self.TOO_MANY_FRAMES_MESSAGE.format(max_frames=self.max_frames))
+        if not self.fast_verify:
+            return super(Base64ImageField, self).validate_file(data)
+
+        from PIL import Image
+
+        data = FileField.to_internal_value(self, data)
+        # Annotate like Django's ImageField so it can be reused.
+        data.image = image
+        data.content_type = Image.MIME.get(image.format)
+        return data
 
     def get_file_extension(self, filename, decoded_file):
-        extension = imghdr.what(filename, decoded_file)
-        extension = "jpg" if extension == "jpeg" else extension
-        return extension
+        return self.detect_file_extension(decoded_file)
+
+
+class ImageSerializerMixin(object):
+    """
+    Save the metadata of the `Base64ImageField`s with `metadata_fields` of
+    a model serializer to the sibling model fields they name, and make the
+    renditions of their images once the instance is saved.
+    """
+
+    def get_image_metadata(self, validated_data):
+        attributes = {}
+        for field in self._writable_fields:
+            if getattr(field, 'metadata_fields', None) and field.source in validated_data:
+                attributes.update(field.get_metadata_attributes(
+                    validated_data[field.source], self.Meta.model))
+        return attributes
+
+    def make_renditions(self, instance, validated_data):
+        for field in self._writable_fields:
+            if (getattr(field, 'renditions', None) and
+                    validated_data.get(field.source) is not None):
+                field.make_renditions(getattr(instance, field.source))
+
+    def create(self, validated_data):
+        validated_data.update(self.get_image_metadata(validated_data))
+        instance = super(ImageSerializerMixin, self).create(validated_data)
+        self.make_renditions(instance, validated_data)
+        return instance
+
+    def update(self, instance, validated_data):
+        validated_data.update(self.get_image_metadata(validated_data))
+        instance = super(ImageSerializerMixin, self).update(instance, validated_data)
+        self.make_renditions(instance, validated_data)
+        return instance
 
 
 class HybridImageField(Base64ImageField):
@@ -107,14 +1029,32 @@ class HybridImageField(Base64ImageField):
 
     def to_internal_value(self, data):
         """
-        Try Base64Field first, and then try the ImageField
-        ``to_internal_value``, MRO doesn't work here because
-        Base64FieldMixin throws before ImageField can run.
+        Dispatch on the type of the data rather than trying base64 first.
+
+        Strings and raw binary values are taken as base64 field data,
+        anything else as an uploaded file.
         """
-        try:
-            return Base64FieldMixin.to_internal_value(self, data)
-        except ValidationError:
-            return ImageField.to_internal_value(self, data)
+        if data in self.EMPTY_VALUES or isinstance(
+                data, six.string_types + BINARY_TYPES):
+            return super(HybridImageField, self).to_internal_value(data)
+        return self.to_internal_value_uploaded(data)
+
+    def to_internal_value_uploaded(self, data):
+        """
+        Validate an uploaded file as it is, without reading it into memory.
+
+        Temporary uploaded files are verified from their path on disk.
+        """
+        size = getattr(data, 'size', None)
+        if size is not None:
+            self.check_decoded_size(size)
+        data = self.validate_file(data)
+        digest = None
+        if self.content_addressed:
+            digest = hashlib.new(self.hash_algorithm)
+            for chunk in data.chunks():
+                digest.update(chunk)
+        return self.process_file(self.save_file(data, digest))
 
 
 class Base64FileField(Base64FieldMixin, FileField):
@@ -127,56 +1067,610 @@ class Base64FileField(Base64FieldMixin, FileField):
     INVALID_TYPE_MESSAGE = _("The type of the file couldn't be determined.")
 
     def get_file_extension(self, filename, decoded_file):
-        raise NotImplemented('Implement file validation and return matching extension.')
+        """
+        Tell the type from the file signature, override for deeper validation.
+        """
+        return self.detect_file_extension(decoded_file)
+
+
+class Base64ArchiveField(Base64FieldMixin, FileField):
+    """
+    A django-rest-framework field for handling zip and tar uploads through
+    raw post data, storing each member of the archive as its own file.
+
+    The archive is decoded in chunks and its members are read one at a time
+    into storage, so neither is held in memory as a whole.
+
+    The number and sizes of members are limited by default against archive
+    bombs, a limit of `None` turns it off.
+    """
+    ALLOWED_TYPES = ('zip', 'tar', 'gz', 'bz2', 'xz')
+    INVALID_FILE_MESSAGE = _("Please upload a valid archive.")
+    INVALID_TYPE_MESSAGE = _("The type of the archive couldn't be determined.")
+    INVALID_MEMBER_TYPE_MESSAGE = _("The type of {name} isn't allowed.")
+    INVALID_MEMBER_NAME_MESSAGE = _("{name} isn't a valid file name.")
+    TOO_MANY_MEMBERS_MESSAGE = _("The archive may not have more than {max_members} files.")
+    MEMBER_TOO_LARGE_MESSAGE = _("{name} may not be larger than {max_size} bytes.")
+    TOTAL_TOO_LARGE_MESSAGE = _(
+        "The files in the archive may not be larger than {max_size} bytes in total.")
+
+    stream_decoding = True
+    member_types = None
+    max_members = 1000
+    max_member_size = 10 * 1024 * 1024
+    max_total_size = 100 * 1024 * 1024
+
+    def __init__(self, *args, **kwargs):
+        self.member_types = kwargs.pop('member_types', self.member_types)
+        self.max_members = kwargs.pop('max_members', self.max_members)
+        self.max_member_size = kwargs.pop('max_member_size', self.max_member_size)
+        self.max_total_size = kwargs.pop('max_total_size', self.max_total_size)
+        super(Base64ArchiveField, self).__init__(*args, **kwargs)
+        assert not (self.content_addressed or self.stream_to_storage), (
+            'Archives are never stored, only their members.')
+
+    def get_file_extension(self, filename, decoded_file):
+        # Tar files are told by a signature at offset 257, which is always
+        # within the sniffed header.
+        return self.detect_file_extension(decoded_file)
+
+    def to_internal_value(self, base64_data):
+        archive = super(Base64ArchiveField, self).to_internal_value(base64_data)
+        if archive is None:
+            return None
+        try:
+            return self.extract_members(archive)
+        finally:
+            archive.close()
+
+    def iter_members(self, archive):
+        """
+        Yield the name, size and an opener of each regular file in an archive.
+
+        Directories, links and devices are skipped.
+        """
+        if archive.name.endswith('.zip'):
+            with zipfile.ZipFile(archive) as zip_file:
+                for info in zip_file.infolist():
+                    if not info.filename.endswith('/'):
+                        yield info.filename, info.file_size, functools.partial(
+                            zip_file.open, info)
+        else:
+            with tarfile.open(fileobj=archive, mode='r:*') as tar_file:
+                for member in tar_file:
+                    if member.isfile():
+                        yield member.name, member.size, functools.partial(
+                            tar_file.extractfile, member)
+
+    def get_member_name(self, archive, name):
+        """
+        Return the storage name of a member, in a directory named after the archive.
+        """
+        parts = [part for part in name.split('/') if part not in ('', '.')]
+        if not parts or '..' in parts:
+            raise ValidationError(self.INVALID_MEMBER_NAME_MESSAGE.format(name=name))
+        return posixpath.join(
+            self.upload_to, posixpath.splitext(archive.name)[0],
+            *[get_valid_filename(part) for part in parts])
+
+    def read_member(self, name, member_file):
+        """
+        Read a member in chunks, stopping at `max_member_size`.
+        """
+        size = 0
+        while True:
+            chunk = member_file.read(self.decode_chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if self.max_member_size is not None and size > self.max_member_size:
+                raise ValidationError(self.MEMBER_TOO_LARGE_MESSAGE.format(
+                    name=name, max_size=self.max_member_size))
+            yield chunk
+
+    def check_member(self, name, size, count, total):
+        """
+        Enforce the limits from the sizes the archive declares for its members.
+        """
+        if self.max_members is not None and count > self.max_members:
+            raise ValidationError(
+                self.TOO_MANY_MEMBERS_MESSAGE.format(max_members=self.max_members))
+        if self.max_member_size is not None and size > self.max_member_size:
+            raise ValidationError(self.MEMBER_TOO_LARGE_MESSAGE.format(
+                name=name, max_size=self.max_member_size))
+        if self.max_total_size is not None and total > self.max_total_size:
+            raise ValidationError(
+                self.TOTAL_TOO_LARGE_MESSAGE.format(max_size=self.max_total_size))
+
+    def extract_members(self, archive):
+        """
+        Store each member of an archive and return them as committed files.
+
+        Members are checked against `member_types` from their header. If any
+        member fails, those already stored are deleted again.
+        """
+        storage = self.get_storage()
+        members = []
+        count = total = 0
+        try:
+            for name, size, open_member in self.iter_members(archive):
+                count += 1
+                total += size
+                self.check_member(name, size, count, total)
+                member_name = self.get_member_name(archive, name)
+                member_file = open_member()
+                try:
+                    chunks = self.read_member(name, member_file)
+                    header = next(chunks, b'')
+                    if self.member_types is not None and (
+                            self.detect_file_extension(header) not in self.member_types):
+                        raise ValidationError(
+                            self.INVALID_MEMBER_TYPE_MESSAGE.format(name=name))
+                    stored_name = self.save_chunks(
+                        storage, member_name, itertools.chain([header], chunks), size)
+                finally:
+                    member_file.close()
+                member = self.committed_file_class(storage, stored_name)
+                member.member_name = name
+                members.append(member)
+        except Exception as exc:
+            for member in members:
+                storage.delete(member.name)
+            if isinstance(exc, (zipfile.BadZipfile, tarfile.TarError, zlib.error,
+                                EOFError, IOError, RuntimeError)):
+                raise ValidationError(self.INVALID_FILE_MESSAGE)
+            raise
+        return members
+
+    def to_representation(self, members):
+        return [
+            super(Base64ArchiveField, self).to_representation(member)
+            for member in members]
+
+
+# The `get_file_extension` implementations only looking at file signatures,
+# whose answer the sniffed header already gives.
+SIGNATURE_EXTENSION_FUNCTIONS = frozenset(
+    six.get_unbound_function(field_class.get_file_extension)
+    for field_class in (Base64ImageField, Base64FileField, Base64ArchiveField))
+
+
+def get_executor(executor=None):
+    """
+    Return the executor given or from the `DRF_EXTRA_FIELDS_EXECUTOR` setting.
+
+    Either may be the dotted path to an executor.
+    """
+    if executor is None:
+        executor = getattr(settings, 'DRF_EXTRA_FIELDS_EXECUTOR', None)
+    if isinstance(executor, six.string_types):
+        executor = import_string(executor)
+    return executor
+
+
+def parse_list_data(field, data):
+    """
+    Return the items of the data of a list field, checked like `ListField`
+    checks them before validating each.
+    """
+    if html.is_html_input(data):
+        data = html.parse_html_list(data)
+    if isinstance(data, (six.string_types, Mapping)) or not hasattr(data, '__iter__'):
+        field.fail('not_a_list', input_type=type(data).__name__)
+    if not field.allow_empty and len(data) == 0:
+        field.fail('empty')
+    return data
+
+
+def validate_base64_file(field_class, args, kwargs, data):
+    """
+    Validate a base64 file in a worker process, returning picklable results.
+
+    Returns `(errors, name, content, content_type)`, where `content` is
+    `None` for files already committed to storage.
+    """
+    field = field_class(*args, **kwargs)
+    # The budget of the request is charged by the parent process.
+    field._context = {field.BUDGET_CONTEXT_KEY: None}
+    try:
+        value = field.run_validation(data)
+    except exceptions.ValidationError as exc:
+        return exc.detail, None, None, None
+    except ValidationError as exc:
+        return get_error_detail(exc), None, None, None
+    if value is None:
+        return None, None, None, None
+    if isinstance(value, CommittedFileMixin):
+        return None, value.name, None, None
+    value.seek(0)
+    try:
+        return None, value.name, value.read(), getattr(value, 'content_type', None)
+    finally:
+        value.close()
+
+
+class ExecutorMixin(object):
+    """
+    Take an `executor` argument, shared rather than copied by `deepcopy`.
+
+    Declared fields are deep copied from their arguments for every
+    serializer, and executors hold locks and queues which can't be.
+    """
+
+    executor = None
+
+    def __init__(self, *args, **kwargs):
+        self.executor = kwargs.pop('executor', self.executor)
+        super(ExecutorMixin, self).__init__(*args, **kwargs)
+
+    def __deepcopy__(self, memo):
+        kwargs = self._kwargs
+        if 'executor' not in kwargs:
+            return super(ExecutorMixin, self).__deepcopy__(memo)
+        self._kwargs = dict(kwargs)
+        executor = self._kwargs.pop('executor')
+        try:
+            field = super(ExecutorMixin, self).__deepcopy__(memo)
+        finally:
+            self._kwargs = kwargs
+        field.executor = field._kwargs['executor'] = executor
+        return field
+
+
+class ConcurrentListMixin(ExecutorMixin):
+    """
+    Validate the items of a list field concurrently in an executor.
+
+    The executor is given as `executor` or the `DRF_EXTRA_FIELDS_EXECUTOR`
+    setting, either a `concurrent.futures` executor or the dotted path to
+    one. Process pools only take base64 file children, which are rebuilt in
+    the workers from their arguments and post-processed in this process.
+    Children whose arguments can't be pickled are validated in turn.
+    """
+
+    # Arguments only used for output or post-processing, which stay here.
+    WORKER_EXCLUDED_KWARGS = (
+        'representation_cache', 'metadata_fields', 'metadata_store', 'rendition_queue')
+
+    def get_executor(self):
+        return get_executor(self.executor)
+
+    def uses_processes(self, executor):
+        return futures is not None and isinstance(
+            executor, futures.ProcessPoolExecutor)
+
+    def to_internal_value(self, data):
+        """
+        Submit all items at once and collect their errors by index.
+        """
+        executor = self.get_executor()
+        processes = self.uses_processes(executor)
+        worker_arguments = None
+        if processes and isinstance(self.child, Base64FieldMixin):
+            worker_arguments = self.get_worker_arguments()
+        if executor is None or processes and worker_arguments is None:
+            return super(ConcurrentListMixin, self).to_internal_value(data)
+
+        data = parse_list_data(self, data)
+
+        submitted = []
+        errors = {}
+        for index, item in enumerate(data):
+            try:
+                submitted.append((index, self.submit(executor, item, worker_arguments)))
+            except ValidationError as exc:
+                errors[index] = get_error_detail(exc)
+
+        values = []
+        for index, future in submitted:
+            try:
+                value = future.result()
+                if worker_arguments is not None:
+                    value = self.child.process_file(self.load_worker_result(value))
+                values.append(value)
+            except exceptions.ValidationError as exc:
+                errors[index] = exc.detail
+            except ValidationError as exc:
+                errors[index] = get_error_detail(exc)
+        if errors:
+            raise exceptions.ValidationError(errors)
+        return values
+
+    def get_worker_arguments(self):
+        """
+        Return the class, args and kwargs to rebuild the child in a worker
+        process, or None if they can't be pickled.
+        """
+        child = self.child
+        kwargs = dict(
+            (key, value) for key, value in six.iteritems(child._kwargs)
+            if key not in self.WORKER_EXCLUDED_KWARGS)
+        arguments = (type(child), child._args, kwargs)
+        try:
+            pickle.dumps(arguments, pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return None
+        return arguments
+
+    def submit(self, executor, item, worker_arguments):
+        child = self.child
+        if worker_arguments is None:
+            return executor.submit(child.run_validation, item)
+        size = child.get_decoded_size(item)
+        if size is not None:
+            child.check_decoded_size(size)
+        if isinstance(item, memoryview):
+            item = item.tobytes()
+        return executor.submit(validate_base64_file, *(worker_arguments + (item,)))
+
+    def load_worker_result(self, result):
+        """
+        Rebuild the file validated by a worker process.
+        """
+        errors, name, content, content_type = result
+        if errors is not None:
+            raise exceptions.ValidationError(errors)
+        if name is None:
+            return None
+        if content is None:
+            return self.child.committed_file_class(self.child.get_storage(), name)
+        value = ContentFile(content, name=name)
+        value.content_type = content_type
+        return value
+
+
+class ConcurrentListField(ConcurrentListMixin, ListField):
+    """
+    A list field validating its items concurrently, e.g. base64 images.
+    """
 
 
 class RangeField(DictField):
+    """
+    A range as a dict of its lower and upper bounds and bounds, or with
+    `range_format` as a PostgreSQL literal (`"[1,10)"`) or an array
+    (`[1, 10, "[)"]`). Dicts are accepted in every format.
+    """
 
     range_type = None
+    range_format = 'dict'
 
     default_error_messages = {
         'not_a_dict': _('Expected a dictionary of items but got type "{input_type}".'),
         'too_much_content': _('Extra content not allowed "{extra}".'),
+        'invalid_literal': _('Expected a range literal like "[1,10)" but got "{value}".'),
+        'invalid_array': _('Expected a list of the lower and upper bound and optionally the bounds.'),
+        'invalid_bounds': _('"{bounds}" are not valid bounds.'),
     }
 
-    def to_internal_value(self, data):
+    def __init__(self, *args, **kwargs):
+        self.range_format = kwargs.pop('range_format', self.range_format)
+        assert self.range_format in RANGE_FORMATS, (
+            '`range_format` should be one of {0}.'.format(', '.join(RANGE_FORMATS)))
+        super(RangeField, self).__init__(*args, **kwargs)
+
+    def parse_range(self, data):
         """
-        Range instances <- Dicts of primitive datatypes.
+        Return the lower and upper bound data, bounds and emptiness of a range.
+
+        Bounds missing from the data are `empty`.
         """
         if html.is_html_input(data):
             data = html.parse_html_dict(data)
-        if not isinstance(data, dict):
-            self.fail('not_a_dict', input_type=type(data).__name__)
-        validated_dict = {}
-        for key in ('lower', 'upper'):
+        if isinstance(data, dict):
+            extra = [key for key in data if key not in RANGE_KEYS]
+            if extra:
+                self.fail('too_much_content', extra=', '.join(map(str, extra)))
+            lower, upper = data.get('lower', empty), data.get('upper', empty)
+            bounds, is_empty = data.get('bounds', '[)'), data.get('empty', False)
+        elif self.range_format == 'literal':
+            if not isinstance(data, six.string_types):
+                self.fail('invalid_literal', value=data)
             try:
-                value = data.pop(key)
-            except KeyError:
-                continue
-            validated_dict[six.text_type(key)] = self.child.run_validation(value)
-        for key in ('bounds', 'empty'):
-            try:
-                value = data.pop(key)
-            except KeyError:
-                continue
-            validated_dict[six.text_type(key)] = value
-        if data:
-            self.fail('too_much_content', extra=', '.join(map(str, data.keys())))
-        return self.range_type(**validated_dict)
+                lower, upper, bounds, is_empty = ranges.parse_range_literal(data)
+            except ValueError:
+                self.fail('invalid_literal', value=data)
+            lower = empty if lower is None else lower
+            upper = empty if upper is None else upper
+        elif self.range_format == 'array':
+            if not isinstance(data, (list, tuple)) or len(data) not in (0, 2, 3):
+                self.fail('invalid_array')
+            is_empty = not data
+            lower = upper = None
+            bounds = '[)'
+            if data:
+                lower, upper = data[0], data[1]
+                bounds = data[2] if len(data) == 3 else bounds
+            lower = empty if lower is None else lower
+            upper = empty if upper is None else upper
+        else:
+            self.fail('not_a_dict', input_type=type(data).__name__)
+        if not is_empty and bounds not in ranges.RANGE_BOUNDS:
+            self.fail('invalid_bounds', bounds=bounds)
+        return lower, upper, bounds, is_empty
+
+    def to_internal_value(self, data):
+        """
+        Range instances <- Dicts, literals or arrays of primitive datatypes.
+        """
+        lower, upper, bounds, is_empty = self.parse_range(data)
+        lower = None if lower is empty else self.child.run_validation(lower)
+        upper = None if upper is empty else self.child.run_validation(upper)
+        return self.range_type(lower, upper, bounds, is_empty)
 
     def to_representation(self, value):
         """
-        Range instances -> dicts of primitive datatypes.
+        Range instances -> dicts, literals or arrays of primitive datatypes.
         """
         if value.isempty:
+            if self.range_format == 'literal':
+                return ranges.EMPTY_LITERAL
+            if self.range_format == 'array':
+                return []
             return {'empty': True}
         lower = self.child.to_representation(value.lower) if value.lower is not None else None
         upper = self.child.to_representation(value.upper) if value.upper is not None else None
+        if self.range_format == 'literal':
+            return ranges.format_range_literal(lower, upper, value._bounds)
+        if self.range_format == 'array':
+            return [lower, upper, value._bounds]
         return {'lower': lower,
                 'upper': upper,
                 'bounds': value._bounds}
 
 
+RANGE_KEYS = ('lower', 'upper', 'bounds', 'empty')
+
+RANGE_FORMATS = ('dict', 'literal', 'array')
+
+NATIVE_BOUND_TYPES = {
+    IntegerField: six.integer_types,
+    FloatField: (float,) + six.integer_types,
+}
+
+
+class RangeListField(ListField):
+    """
+    A list of ranges with their bounds validated in bulk, e.g.
+    `RangeListField(child=DateRangeField())`.
+
+    Equal bound values are validated once, integer and float bounds which
+    already have their internal type skip conversion, and with NumPy
+    installed numeric bounds are checked as one array. The validators and
+    null handling of the child apply to each range, errors are collected
+    by item index.
+    """
+
+    use_numpy = True
+
+    def __init__(self, *args, **kwargs):
+        self.use_numpy = kwargs.pop('use_numpy', self.use_numpy)
+        super(RangeListField, self).__init__(*args, **kwargs)
+        assert isinstance(self.child, RangeField), (
+            'The `child` of a `RangeListField` should be a range field.')
+
+    def to_internal_value(self, data):
+        data = parse_list_data(self, data)
+
+        child = self.child
+        parsed = []
+        bound_data = []
+        errors = {}
+        for index, item in enumerate(data):
+            try:
+                # Null items, if the child allows them, are kept as they are.
+                is_empty_value, item = child.validate_empty_values(item)
+                if is_empty_value:
+                    parsed.append((index, item))
+                    continue
+                lower, upper, bounds, is_empty = child.parse_range(item)
+            except exceptions.ValidationError as exc:
+                errors[index] = exc.detail
+                continue
+            # Bounds are replaced by their position in `bound_data`.
+            if lower is not empty:
+                bound_data.append(lower)
+                lower = len(bound_data) - 1
+            if upper is not empty:
+                bound_data.append(upper)
+                upper = len(bound_data) - 1
+            parsed.append((index, (lower, upper, bounds, is_empty)))
+
+        bound_values, bound_errors = self.validate_bounds(bound_data)
+        range_type = child.range_type
+        values = []
+        for index, item in parsed:
+            if not isinstance(item, tuple):
+                values.append(item)
+                continue
+            lower, upper, bounds, is_empty = item
+            if lower is not empty and lower in bound_errors:
+                errors[index] = bound_errors[lower]
+                continue
+            if upper is not empty and upper in bound_errors:
+                errors[index] = bound_errors[upper]
+                continue
+            value = range_type(
+                None if lower is empty else bound_values[lower],
+                None if upper is empty else bound_values[upper],
+                bounds, is_empty)
+            try:
+                child.run_validators(value)
+            except exceptions.ValidationError as exc:
+                errors[index] = exc.detail
+                continue
+            values.append(value)
+        if errors:
+            raise exceptions.ValidationError(errors)
+        return values
+
+    def validate_bounds(self, data):
+        """
+        Return the validated bounds and their errors by position.
+        """
+        values = self.validate_numeric_bounds(data)
+        if values is not None:
+            return values, {}
+        values = []
+        errors = {}
+        cache = {}
+        for position, value in enumerate(data):
+            try:
+                key = (type(value), value)
+                result = cache[key]
+            except TypeError:
+                result = self.validate_bound(value)
+            except KeyError:
+                result = cache[key] = self.validate_bound(value)
+            value, detail = result
+            if detail is not None:
+                errors[position] = detail
+            values.append(value)
+        return values, errors
+
+    def validate_bound(self, value):
+        """
+        Return a validated bound and its errors.
+        """
+        child = self.child.child
+        try:
+            if type(value) in NATIVE_BOUND_TYPES.get(type(child), ()):
+                # Already of the internal type, only the validators are left.
+                if type(child) is FloatField:
+                    value = float(value)
+                child.run_validators(value)
+                return value, None
+            return child.run_validation(value), None
+        except exceptions.ValidationError as exc:
+            return None, exc.detail
+
+    def validate_numeric_bounds(self, data):
+        """
+        Validate numeric bounds as one array, or return None if they can't be.
+        """
+        child = self.child.child
+        if not self.use_numpy or numpy is None or not data:
+            return None
+        kinds = {IntegerField: 'iu', FloatField: 'iuf'}.get(type(child))
+        if kinds is None or any(
+                not isinstance(validator, (MinValueValidator, MaxValueValidator))
+                for validator in child.validators):
+            return None
+        if not set(map(type, data)).issubset(NATIVE_BOUND_TYPES[type(child)]):
+            return None
+        array = numpy.asarray(data)
+        if array.dtype.kind not in kinds:
+            return None
+        # Out of range bounds are left to `validate_bound` for their messages.
+        if child.min_value is not None and array.min() < child.min_value:
+            return None
+        if child.max_value is not None and array.max() > child.max_value:
+            return None
+        if type(child) is FloatField:
+            array = array.astype(float)
+        return array.tolist()
+
+
 class IntegerRangeField(RangeField):
     child = IntegerField()
     range_type = NumericRange
@@ -197,6 +1691,58 @@ class DateRangeField(RangeField):
     range_type = DateRange
 
 
+class MultiRangeField(RangeListField):
+    """
+    A set of ranges, like a PostgreSQL multirange, normalized to sorted
+    ranges without overlaps or adjacent ones.
+
+    Discrete ranges, with a `range_step` between their values, get `[)`
+    bounds. Django has no multirange model field, so these are left for
+    e.g. array fields of ranges.
+    """
+
+    range_step = None
+
+    default_error_messages = {
+        'lower_above_upper': _('The lower bound may not be above the upper bound.'),
+    }
+
+    def to_internal_value(self, data):
+        values = super(MultiRangeField, self).to_internal_value(data)
+        errors = {}
+        for index, value in enumerate(values):
+            if value is None:
+                continue
+            if value.lower is not None and value.upper is not None and value.lower > value.upper:
+                errors[index] = [self.error_messages['lower_above_upper']]
+        if errors:
+            raise exceptions.ValidationError(errors)
+        return self.merge(values)
+
+    def to_representation(self, data):
+        return super(MultiRangeField, self).to_representation(self.merge(data))
+
+    def merge(self, values):
+        range_type = self.child.range_type
+        return [range_type(lower, upper, bounds)
+                for lower, upper, bounds in ranges.merge_ranges(
+                    (value for value in values if value is not None), self.range_step)]
+
+
+class IntegerMultiRangeField(MultiRangeField):
+    child = IntegerRangeField()
+    range_step = 1
+
+
+class DateMultiRangeField(MultiRangeField):
+    child = DateRangeField()
+    range_step = datetime.timedelta(days=1)
+
+
+class DateTimeMultiRangeField(MultiRangeField):
+    child = DateTimeRangeField()
+
+
 if postgres_fields is not None:
     # monkey patch modelserializer to map Native django Range fields to
     # drf_extra_fiels's Range fields.
@@ -0,0 +1,89 @@
+"""
+Filtering of list endpoints by PostgreSQL range model fields.
+"""
+
+import copy
+
+from django.core.exceptions import ImproperlyConfigured
+
+from rest_framework import exceptions
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.serializers import ModelSerializer
+from rest_framework.utils.field_mapping import ClassLookupDict
+
+from . import fields
+from . import ranges
+
+
+class RangeFilterBackend(BaseFilterBackend):
+    """
+    Filter by range model fields with `<field>__<lookup>=<value>` query
+    parameters, e.g. `?period__overlap=[2001-01-01,2001-02-01)`.
+
+    The lookups are the range lookups of `django.contrib.postgres`, which
+    the database can answer from a GiST index. Values are range literals,
+    or single values for `contains`, validated by the same range fields as
+    serializers use.
+
+    The filtered fields are the `range_filter_fields` of the view, either
+    model field names, for which the range fields are found like
+    `ModelSerializer` does, or a dict of them to range fields.
+    """
+
+    lookups = ('overlap', 'contains', 'contained_by', 'fully_lt')
+
+    def get_range_fields(self, view, queryset):
+        """
+        Return a dict of the filtered model field names to range fields.
+        """
+        range_filter_fields = getattr(view, 'range_filter_fields', ())
+        if not isinstance(range_filter_fields, dict):
+            field_mapping = ClassLookupDict(ModelSerializer.serializer_field_mapping)
+            range_filter_fields = dict(
+                (name, field_mapping[queryset.model._meta.get_field(name)])
+                for name in range_filter_fields)
+
+        range_fields = {}
+        for name, field in range_filter_fields.items():
+            if isinstance(field, type):
+                field = field()
+            if not isinstance(field, fields.RangeField):
+                raise ImproperlyConfigured(
+                    '`{0}` is not a range field and can\'t be filtered by '
+                    '`RangeFilterBackend`.'.format(name))
+            # Query parameters are literals, whatever format bodies use.
+            field = copy.deepcopy(field)
+            field.range_format = 'literal'
+            range_fields[name] = field
+        return range_fields
+
+    def filter_queryset(self, request, queryset, view):
+        filters = {}
+        errors = {}
+        for name, field in self.get_range_fields(view, queryset).items():
+            for lookup in self.lookups:
+                param = '{0}__{1}'.format(name, lookup)
+                if param not in request.query_params:
+                    continue
+                try:
+                    filters[param] = self.parse_value(
+                        field, lookup, request.query_params[param])
+                except exceptions.ValidationError as exc:
+                    errors[param] = exc.detail
+        if errors:
+            raise exceptions.ValidationError(errors)
+        if not filters:
+            return queryset
+        return queryset.filter(**filters)
+
+    def parse_value(self, field, lookup, value):
+        """
+        Return the range, or single value for `contains`, of a parameter.
+        """
+        if lookup == 'contains' and not self.is_range(value):
+            return field.child.run_validation(value)
+        return field.to_internal_value(value)
+
+    def is_range(self, value):
+        value = value.strip()
+        return value[:1] in ('[', '(') or value.lower() == ranges.EMPTY_LITERAL
@@ -1,6 +1,7 @@
 import json
-from django.contrib.gis.geos import GEOSGeometry
-from django.contrib.gis.geos.error import GEOSException
+import math
+
+from django.contrib.gis.geos import GEOSGeometry, Point
 from django.utils.encoding import smart_str
 from django.utils import six
 from django.utils.translation import ugettext_lazy as _
@@ -9,6 +10,8 @@ from rest_framework import serializers
 
 EMPTY_VALUES = (None, '', [], (), {})
 
+POINT_FORMATS = ('string', 'float', 'array', 'geojson')
+
 
 class PointField(serializers.Field):
     """
@@ -19,14 +22,33 @@ class PointField(serializers.Field):
          "longitude": 24.452545489
         }
 
+    Points may also be `[longitude, latitude]` arrays or GeoJSON, and
+    strings the JSON of any of those, `"latitude,longitude"`, WKT
+    (`"POINT(longitude latitude)"`) or EWKT (`"SRID=4326;POINT(...)"`).
+    Points get the SRID of EWKT input or the `srid` argument.
+
+    Output is the dict with strings by default, or as `point_format` says
+    with floats (`'float'`), as an array (`'array'`) or as GeoJSON
+    (`'geojson'`). `precision` rounds coordinates to that many decimals.
     """
     type_name = 'PointField'
     type_label = 'point'
+    srid = None
+    point_format = 'string'
+    precision = None
 
     default_error_messages = {
         'invalid': _('Enter a valid location.'),
     }
 
+    def __init__(self, *args, **kwargs):
+        self.srid = kwargs.pop('srid', self.srid)
+        self.point_format = kwargs.pop('point_format', self.point_format)
+        self.precision = kwargs.pop('precision', self.precision)
+        assert self.point_format in POINT_FORMATS, (
+            '`point_format` should be one of {0}.'.format(', '.join(POINT_FORMATS)))
+        super(PointField, self).__init__(*args, **kwargs)
+
     def to_internal_value(self, value):
         """
         Parse json data and return a point object
@@ -35,23 +57,91 @@ class PointField(serializers.Field):
             return None
 
         if isinstance(value, six.string_types):
+            value = self.parse_string(value)
+            if isinstance(value, Point):
+                return value
+
+        if isinstance(value, (list, tuple)):
+            return self.parse_coordinates(value)
+        if value and isinstance(value, dict):
+            if 'coordinates' in value:
+                return self.parse_geojson(value)
+            return self.make_point(value.get("longitude"), value.get("latitude"))
+        self.fail('invalid')
+
+    def parse_coordinates(self, coordinates):
+        if not isinstance(coordinates, (list, tuple)) or len(coordinates) != 2:
+            self.fail('invalid')
+        return self.make_point(coordinates[0], coordinates[1])
+
+    def parse_geojson(self, value):
+        if value.get('type') != 'Point':
+            self.fail('invalid')
+        return self.parse_coordinates(value['coordinates'])
+
+    def parse_string(self, value):
+        """
+        Return a point, or the dict of JSON input, parsed from a string.
+        """
+        value = value.strip()
+        if value.startswith('['):
+            try:
+                return json.loads(value)
+            except ValueError:
+                self.fail('invalid')
+        if value.startswith('{'):
+            try:
+                return json.loads(value)
+            except ValueError:
+                pass
+            # Python dict literals, as some clients send.
             try:
-                value = value.replace("'", '"')
-                value = json.loads(value)
+                return json.loads(value.replace("'", '"'))
             except ValueError:
                 self.fail('invalid')
 
-        if value and isinstance(value, dict):
+        srid = None
+        if value[:5].upper() == 'SRID=':
+            srid, semicolon, value = value[5:].partition(';')
             try:
-                latitude = value.get("latitude")
-                longitude = value.get("longitude")
-                return GEOSGeometry('POINT(%(longitude)s %(latitude)s)' % {
-                    "longitude": longitude,
-                    "latitude": latitude}
-                )
-            except (GEOSException, ValueError):
+                srid = int(srid)
+            except ValueError:
                 self.fail('invalid')
-        self.fail('invalid')
+            value = value.strip()
+        if value[:5].upper() == 'POINT':
+            inside = value[5:].strip()
+            if inside[:1] != '(' or inside[-1:] != ')':
+                self.fail('invalid')
+            coordinates = inside[1:-1].split()
+            if len(coordinates) != 2:
+                self.fail('invalid')
+            return self.make_point(coordinates[0], coordinates[1], srid)
+        if srid is not None:
+            self.fail('invalid')
+
+        latitude, comma, longitude = value.partition(',')
+        if not comma:
+            self.fail('invalid')
+        return self.make_point(longitude, latitude)
+
+    def make_point(self, longitude, latitude, srid=None):
+        """
+        Return a point of validated coordinates, without a WKT round trip.
+        """
+        return Point(
+            self.to_coordinate(longitude), self.to_coordinate(latitude),
+            srid=self.srid if srid is None else srid)
+
+    def to_coordinate(self, value):
+        if isinstance(value, bool):
+            self.fail('invalid')
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            self.fail('invalid')
+        if math.isnan(value) or math.isinf(value):
+            self.fail('invalid')
+        return value
 
     def to_representation(self, value):
         """
@@ -61,8 +151,18 @@ class PointField(serializers.Field):
             return value
 
         if isinstance(value, GEOSGeometry):
+            longitude, latitude = value.x, value.y
+            if self.precision is not None:
+                longitude = round(longitude, self.precision)
+                latitude = round(latitude, self.precision)
+            if self.point_format == 'array':
+                return [longitude, latitude]
+            if self.point_format == 'geojson':
+                return {"type": "Point", "coordinates": [longitude, latitude]}
+            if self.point_format == 'string':
+                longitude, latitude = smart_str(longitude), smart_str(latitude)
             value = {
-                "latitude": smart_str(value.y),
-                "longitude": smart_str(value.x)
+                "latitude": latitude,
+                "longitude": longitude
             }
         return value
@@ -0,0 +1,156 @@
+"""
+Parsing and formatting of PostgreSQL range literals, e.g. `[1,10)`, and
+merging of ranges into multiranges.
+
+Literals are scanned by hand rather than with regular expressions: the
+common unquoted case is a single `partition`, only bounds in double quotes
+are read character by character.
+"""
+
+from django.utils import six
+
+
+EMPTY_LITERAL = 'empty'
+RANGE_BOUNDS = ('[)', '(]', '[]', '()')
+
+# Characters which make a bound need quoting in a literal.
+SPECIAL_CHARACTERS = frozenset('"\\,()[] \t\n\r')
+
+
+def parse_range_literal(text):
+    """
+    Return the lower and upper bound text, bounds and emptiness of a literal.
+
+    Unbounded ends are None. Raise ValueError for invalid literals.
+    """
+    text = text.strip()
+    if text.lower() == EMPTY_LITERAL:
+        return None, None, None, True
+    if len(text) < 3 or text[0] not in '[(' or text[-1] not in '])':
+        raise ValueError(text)
+    bounds = text[0] + text[-1]
+    inner = text[1:-1]
+    if '"' not in inner and '\\' not in inner:
+        lower, comma, upper = inner.partition(',')
+        if not comma or ',' in upper:
+            raise ValueError(text)
+        return lower.strip() or None, upper.strip() or None, bounds, False
+
+    lower, position = read_bound(inner, 0)
+    if inner[position:position + 1] != ',':
+        raise ValueError(text)
+    upper, position = read_bound(inner, position + 1)
+    if position != len(inner):
+        raise ValueError(text)
+    return lower, upper, bounds, False
+
+
+def read_bound(inner, start):
+    """
+    Return a bound of the inside of a literal and the position after it.
+    """
+    if inner[start:start + 1] != '"':
+        end = inner.find(',', start)
+        if end == -1:
+            end = len(inner)
+        value = inner[start:end]
+        if '"' in value or '\\' in value:
+            raise ValueError(inner)
+        return value.strip() or None, end
+
+    characters = []
+    position = start + 1
+    while position < len(inner):
+        character = inner[position]
+        if character == '\\' and position + 1 < len(inner):
+            characters.append(inner[position + 1])
+            position += 2
+        elif character == '"':
+            # A doubled quote stands for one inside a quoted bound.
+            if inner[position + 1:position + 2] == '"':
+                characters.append('"')
+                position += 2
+            else:
+                return ''.join(characters), position + 1
+        else:
+            characters.append(character)
+            position += 1
+    raise ValueError(inner)
+
+
+def quote_bound(value):
+    """
+    Return the text of a bound for a literal, quoted if needed.
+    """
+    if value is None:
+        return ''
+    value = six.text_type(value)
+    if value and SPECIAL_CHARACTERS.isdisjoint(value):
+        return value
+    return '"{0}"'.format(value.replace('\\', '\\\\').replace('"', '\\"'))
+
+
+def format_range_literal(lower, upper, bounds):
+    """
+    Return the literal of a range, with None for unbounded ends.
+    """
+    return ''.join((bounds[0], quote_bound(lower), ',', quote_bound(upper), bounds[1]))
+
+
+def get_bounds(lower_inc, upper_inc):
+    return ('[' if lower_inc else '(') + (']' if upper_inc else ')')
+
+
+def get_ends(value, step=None):
+    """
+    Return `(lower, lower_inc, upper, upper_inc)` of a range, or None if it
+    is empty.
+
+    `step` is the distance between values of discrete ranges, e.g. 1 for
+    integers, their bounds are made `[)` like PostgreSQL does.
+    """
+    if value.isempty:
+        return None
+    lower, lower_inc = value.lower, value.lower_inc
+    upper, upper_inc = value.upper, value.upper_inc
+    if step is not None:
+        if lower is not None and not lower_inc:
+            lower, lower_inc = lower + step, True
+        if upper is not None and upper_inc:
+            upper, upper_inc = upper + step, False
+    if lower is not None and upper is not None and (
+            lower > upper or lower == upper and not (lower_inc and upper_inc)):
+        return None
+    return lower, lower_inc, upper, upper_inc
+
+
+def sort_key(ends):
+    # Unbounded lower ends first, then inclusive before exclusive ones.
+    return ends[0] is not None, ends[0], not ends[1]
+
+
+def merge_ranges(values, step=None):
+    """
+    Return `(lower, upper, bounds)` of the union of ranges, sorted and with
+    overlapping or adjacent ranges coalesced, in O(n log n).
+
+    Discrete ranges with a `step` get `[)` bounds, see `get_ends`. Empty
+    ranges are left out.
+    """
+    ends = [ends for ends in (get_ends(value, step) for value in values) if ends is not None]
+    ends.sort(key=sort_key)
+
+    merged = []
+    for lower, lower_inc, upper, upper_inc in ends:
+        if merged:
+            last = merged[-1]
+            last_upper = last[2]
+            if last_upper is None or lower is None or lower < last_upper or (
+                    lower == last_upper and (last[3] or lower_inc)):
+                if last_upper is not None and (upper is None or upper > last_upper or (
+                        upper == last_upper and upper_inc)):
+                    last[2], last[3] = upper, upper_inc
+                continue
+        merged.append([lower, lower_inc, upper, upper_inc])
+    return [(lower, upper, get_bounds(lower_inc, upper_inc))
+            for lower, lower_inc, upper, upper_inc in merged]
@@ -0,0 +1,112 @@
+"""
+Derived versions of uploaded images, e.g. thumbnails or re-encodings.
+"""
+
+import io
+import logging
+import threading
+
+from django.utils.six.moves import queue
+
+logger = logging.getLogger(__name__)
+
+# File extensions of the Pillow formats commonly rendered to.
+FORMAT_EXTENSIONS = {
+    'JPEG': 'jpg',
+    'PNG': 'png',
+    'GIF': 'gif',
+    'WEBP': 'webp',
+}
+
+
+class Rendition(object):
+    """
+    A named version of an image, scaled down to fit in `size`.
+
+    `format` is a Pillow format name and defaults to the one of the
+    original image. JPEG renditions are progressive. EXIF metadata is
+    dropped unless `strip_exif` is `False`.
+    """
+
+    def __init__(self, name, size, format=None, quality=None, strip_exif=True):
+        self.name = name
+        self.size = size
+        self.format = format
+        self.quality = quality
+        self.strip_exif = strip_exif
+
+    def get_extension(self, extension):
+        """
+        Return the file extension of renditions of files with `extension`.
+        """
+        if self.format is None:
+            return extension
+        format = self.format.upper()
+        return FORMAT_EXTENSIONS.get(format, format.lower())
+
+    def render(self, image):
+        """
+        Return the encoded contents of the rendition of a Pillow image.
+        """
+        from PIL import Image, ImageOps
+
+        format = (self.format or image.format).upper()
+        exif = image.info.get('exif')
+        if self.strip_exif and hasattr(ImageOps, 'exif_transpose'):
+            # Keep the orientation the EXIF metadata would have given.
+            image = ImageOps.exif_transpose(image)
+        image.thumbnail(self.size, Image.LANCZOS)
+        if format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+
+        options = {}
+        if self.quality is not None:
+            options['quality'] = self.quality
+        if format == 'JPEG':
+            options.update(progressive=True, optimize=True)
+        if not self.strip_exif and exif:
+            options['exif'] = exif
+        output = io.BytesIO()
+        image.save(output, format, **options)
+        return output.getvalue()
+
+
+class WorkerQueue(object):
+    """
+    Run functions one after another on a background thread of this process.
+
+    The thread is started on first use. Errors are logged, not raised.
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def put(self, func, *args):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self.run, name='drf-extra-fields-renditions')
+                self.thread.daemon = True
+                self.thread.start()
+        self.queue.put((func, args))
+
+    def run(self):
+        while True:
+            func, args = self.queue.get()
+            try:
+                func(*args)
+            except Exception:
+                logger.exception('Error running %r', func)
+            finally:
+                self.queue.task_done()
+
+    def join(self):
+        """
+        Wait until all queued functions have run.
+        """
+        self.queue.join()
+
+
+default_queue = WorkerQueue()
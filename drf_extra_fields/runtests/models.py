@@ -8,6 +8,8 @@ from django.db import models
 from django.contrib.contenttypes import fields as ct_fields
 from django.contrib.contenttypes import models as ct_models
 
+from drf_extra_fields.compat import postgres_fields
+
 
 class Person(models.Model):
     """
@@ -38,3 +40,28 @@ class Article(models.Model):
         default=uuid.uuid4, blank=False, editable=False, unique=True)
     author = models.ForeignKey(
         Person, blank=False, related_name='articles')
+
+
+class Document(models.Model):
+    """
+    Example model with uploaded files.
+    """
+
+    file = models.FileField(blank=True)
+    image = models.ImageField(blank=True)
+    image_width = models.PositiveIntegerField(null=True, blank=True)
+    image_height = models.PositiveIntegerField(null=True, blank=True)
+    image_format = models.CharField(max_length=16, blank=True)
+    image_digest = models.CharField(max_length=128, blank=True)
+
+
+if postgres_fields is not None:
+    class Booking(models.Model):
+        """
+        Example model with range fields.
+        """
+
+        period = postgres_fields.DateTimeRangeField(null=True)
+        days = postgres_fields.DateRangeField(null=True)
+        seats = postgres_fields.IntegerRangeField(null=True)
+        name = models.CharField(max_length=255, blank=True)
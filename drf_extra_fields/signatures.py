@@ -0,0 +1,129 @@
+"""
+Recognize file types from the magic numbers their contents start with.
+"""
+
+import collections
+
+from django.utils import six
+
+Signature = collections.namedtuple(
+    'Signature', ('extension', 'mime_type', 'magic', 'offset', 'checks'))
+
+
+class SignatureRegistry(object):
+    """
+    Map magic numbers to file extensions and MIME types.
+
+    Magic numbers are kept in one prefix tree per offset they start at, so
+    telling the type of a file walks its header once instead of trying
+    each format in turn.
+    """
+
+    def __init__(self):
+        self.trees = {}
+        self.extensions = {}
+        self.max_length = 0
+
+    def register(self, magic, extension, mime_type, offset=0, checks=()):
+        """
+        Recognize files whose contents at `offset` start with `magic`.
+
+        `checks` are further `(offset, bytes)` pairs that must match too, for
+        formats whose magic number isn't contiguous.
+        """
+        signature = Signature(
+            extension, mime_type, magic, offset, tuple(checks))
+        node = self.trees.setdefault(offset, {})
+        for byte in bytearray(magic):
+            node = node.setdefault(byte, {})
+        node.setdefault(None, []).append(signature)
+        self.extensions.setdefault(extension, signature)
+        self.max_length = max(
+            [self.max_length, offset + len(magic)] +
+            [check_offset + len(value) for check_offset, value in checks])
+        return signature
+
+    def match(self, header):
+        """
+        Return the most specific signature the header matches, if any.
+        """
+        header = bytes(bytearray(header[:self.max_length]))
+        found = None
+        for offset, node in six.iteritems(self.trees):
+            for byte in bytearray(header[offset:]):
+                node = node.get(byte)
+                if node is None:
+                    break
+                for signature in node.get(None, ()):
+                    if found is not None and len(signature.magic) < len(found.magic):
+                        continue
+                    if all(header[check_offset:check_offset + len(value)] == value
+                           for check_offset, value in signature.checks):
+                        found = signature
+        return found
+
+    def detect(self, decoded_file):
+        """
+        Match the header of decoded bytes or of a file object.
+        """
+        if hasattr(decoded_file, 'read'):
+            position = decoded_file.tell()
+            header = decoded_file.read(self.max_length)
+            decoded_file.seek(position)
+        else:
+            header = decoded_file
+        return self.match(header)
+
+    def get_mime_type(self, extension):
+        """
+        Return the MIME type registered for an extension, if any.
+        """
+        signature = self.extensions.get(extension)
+        return signature.mime_type if signature is not None else None
+
+
+registry = SignatureRegistry()
+
+
+def register(magic, extension, mime_type, offset=0, checks=()):
+    """
+    Add a signature to the registry shared by the base64 fields.
+    """
+    return registry.register(
+        magic, extension, mime_type, offset=offset, checks=checks)
+
+
+# Images
+register(b'\xff\xd8\xff', 'jpg', 'image/jpeg')
+register(b'\x89PNG\r\n\x1a\n', 'png', 'image/png')
+register(b'GIF87a', 'gif', 'image/gif')
+register(b'GIF89a', 'gif', 'image/gif')
+register(b'BM', 'bmp', 'image/bmp')
+register(b'II*\x00', 'tiff', 'image/tiff')
+register(b'MM\x00*', 'tiff', 'image/tiff')
+register(b'RIFF', 'webp', 'image/webp', checks=[(8, b'WEBP')])
+register(b'\x00\x00\x01\x00', 'ico', 'image/x-icon')
+register(b'8BPS', 'psd', 'image/vnd.adobe.photoshop')
+# ISO base media files start with the size of their `ftyp` box.
+for brand in (b'avif', b'avis'):
+    register(b'ftyp' + brand, 'avif', 'image/avif', offset=4)
+for brand in (b'heic', b'heix', b'hevc', b'hevx', b'heim', b'heis'):
+    register(b'ftyp' + brand, 'heic', 'image/heic', offset=4)
+for brand in (b'mif1', b'msf1'):
+    register(b'ftyp' + brand, 'heif', 'image/heif', offset=4)
+
+# Documents
+register(b'%PDF-', 'pdf', 'application/pdf')
+register(b'{\\rtf', 'rtf', 'application/rtf')
+register(b'%!PS', 'ps', 'application/postscript')
+
+# Archives
+register(b'PK\x03\x04', 'zip', 'application/zip')
+register(b'PK\x05\x06', 'zip', 'application/zip')
+register(b'\x1f\x8b', 'gz', 'application/gzip')
+register(b'BZh', 'bz2', 'application/x-bzip2')
+register(b'\xfd7zXZ\x00', 'xz', 'application/x-xz')
+register(b'(\xb5/\xfd', 'zst', 'application/zstd')
+register(b'7z\xbc\xaf\x27\x1c', '7z', 'application/x-7z-compressed')
+register(b'Rar!\x1a\x07', 'rar', 'application/vnd.rar')
+register(b'ustar', 'tar', 'application/x-tar', offset=257)
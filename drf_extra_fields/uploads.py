@@ -0,0 +1,408 @@
+"""
+Resumable uploads of large files in chunks, for use by base64 fields.
+
+Clients create an upload with its total size, send its chunks in order
+with the offset each starts at, and finally give the upload token to a
+base64 field instead of the whole file. After an interruption, the offset
+to resume from is read back from the upload.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
+from django.utils import six
+from django.utils.translation import ugettext_lazy as _
+
+from rest_framework import exceptions
+from rest_framework import response
+from rest_framework import serializers
+from rest_framework import status
+from rest_framework import viewsets
+
+from . import fields
+from .compat import fcntl
+
+DEFAULT_MAX_UPLOAD_SIZE = 100 * 1024 * 1024
+DEFAULT_UPLOAD_MAX_AGE = 24 * 60 * 60
+
+
+class UploadError(Exception):
+    """
+    The upload doesn't exist or isn't complete.
+    """
+
+
+class OffsetMismatch(UploadError):
+    """
+    A chunk doesn't start where the upload currently ends.
+    """
+
+    def __init__(self, offset):
+        super(OffsetMismatch, self).__init__(offset)
+        self.offset = offset
+
+
+class ChunkTooLarge(UploadError):
+    """
+    A chunk goes beyond the total size of the upload.
+    """
+
+
+class CompletedUpload(UploadedFile):
+    """
+    A completed upload, which storages can move into place without copying.
+    """
+
+    def __init__(self, path, size):
+        super(CompletedUpload, self).__init__(
+            open(path, 'rb'), os.path.basename(path),
+            fields.DEFAULT_CONTENT_TYPE, size, None)
+        self.path = path
+
+    def temporary_file_path(self):
+        return self.path
+
+
+class LocalUploadStore(object):
+    """
+    Keep uploads in progress in a local directory.
+
+    The directory defaults to the `DRF_EXTRA_FIELDS_UPLOAD_DIR` setting,
+    or a directory in the system temporary directory. Each upload is a
+    `<token>.part` file with its total size in `<token>.json`.
+
+    Uploads not written to for `max_age` seconds, a day by default, are
+    removed when uploads are created, at most every `expire_interval`
+    seconds. `None` leaves expiry to explicit `expire` calls.
+    """
+
+    expire_interval = 60
+
+    def __init__(self, directory=None, max_age=DEFAULT_UPLOAD_MAX_AGE):
+        self._directory = directory
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.expired_at = None
+
+    @property
+    def directory(self):
+        directory = self._directory or getattr(
+            settings, 'DRF_EXTRA_FIELDS_UPLOAD_DIR', None) or os.path.join(
+                tempfile.gettempdir(), 'drf-extra-fields-uploads')
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:  # pragma: no cover
+                # Created concurrently
+                if not os.path.isdir(directory):
+                    raise
+        return directory
+
+    def get_path(self, token, extension='part'):
+        # Tokens are client data, don't let them name other files.
+        if len(token) != 32 or token.strip('0123456789abcdef'):
+            raise UploadError(token)
+        return os.path.join(self.directory, '{0}.{1}'.format(token, extension))
+
+    def create(self, size):
+        """
+        Start an upload of `size` bytes and return its token.
+        """
+        self.expire_stale()
+        token = uuid.uuid4().hex
+        with open(self.get_path(token, 'json'), 'w') as meta:
+            json.dump({'size': size}, meta)
+        open(self.get_path(token), 'wb').close()
+        return token
+
+    def get_size(self, token):
+        """
+        Return the total size of an upload.
+        """
+        try:
+            with open(self.get_path(token, 'json')) as meta:
+                return json.load(meta)['size']
+        except (IOError, OSError, ValueError, KeyError):
+            raise UploadError(token)
+
+    def get_offset(self, token):
+        """
+        Return the number of bytes received so far.
+        """
+        try:
+            return os.path.getsize(self.get_path(token))
+        except OSError:
+            raise UploadError(token)
+
+    def append(self, token, offset, chunk):
+        """
+        Add a chunk starting at `offset` and return the new offset.
+
+        Chunks which don't start at the current offset raise
+        `OffsetMismatch`, ones going beyond the total size `ChunkTooLarge`.
+        The part file is locked from the offset
+        check to the write, also against other processes.
+        """
+        size = self.get_size(token)
+        path = self.get_path(token)
+        if not os.path.exists(path):
+            raise UploadError(token)
+        with self.lock, open(path, 'ab') as part:
+            if fcntl is not None:
+                fcntl.flock(part, fcntl.LOCK_EX)
+            current = os.fstat(part.fileno()).st_size
+            if offset != current:
+                raise OffsetMismatch(current)
+            if offset + len(chunk) > size:
+                raise ChunkTooLarge(token)
+            part.write(chunk)
+            return current + len(chunk)
+
+    def is_complete(self, token):
+        return self.get_offset(token) == self.get_size(token)
+
+    def open(self, token):
+        """
+        Return a completed upload as an uploaded file.
+        """
+        if not self.is_complete(token):
+            raise UploadError(token)
+        return CompletedUpload(self.get_path(token), self.get_size(token))
+
+    def delete(self, token, extensions=('part', 'json')):
+        for extension in extensions:
+            try:
+                os.remove(self.get_path(token, extension))
+            except OSError:
+                pass
+
+    def release(self, token):
+        """
+        Forget a consumed upload, so its token can't be used again.
+
+        The part file is left for a file system storage to move into place,
+        or for expiry otherwise.
+        """
+        self.delete(token, ('json',))
+
+    def expire(self, max_age):
+        """
+        Delete the uploads not written to in the last `max_age` seconds.
+        """
+        expired = time.time() - max_age
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < expired:
+                    os.remove(path)
+            except OSError:  # pragma: no cover
+                # Removed concurrently
+                pass
+
+    def expire_stale(self):
+        """
+        Run `expire` with `max_age`, unless it ran in the last `expire_interval`.
+        """
+        now = time.time()
+        if self.max_age is None or (
+                self.expired_at is not None and now - self.expired_at < self.expire_interval):
+            return
+        self.expired_at = now
+        self.expire(self.max_age)
+
+
+default_store = LocalUploadStore()
+
+
+class ChunkField(serializers.Field):
+    """
+    A chunk of an upload, as base64 or raw binary data.
+    """
+
+    default_error_messages = {
+        'invalid': _('Please upload a valid chunk.'),
+    }
+
+    def to_internal_value(self, data):
+        if isinstance(data, fields.BINARY_TYPES):
+            return memoryview(data).tobytes()
+        if isinstance(data, six.string_types):
+            try:
+                return base64.b64decode(data)
+            except (TypeError, ValueError, binascii.Error):
+                pass
+        self.fail('invalid')
+
+
+class UploadSerializer(serializers.Serializer):
+    size = serializers.IntegerField(min_value=1)
+
+
+class UploadChunkSerializer(serializers.Serializer):
+    offset = serializers.IntegerField(min_value=0)
+    chunk = ChunkField()
+
+
+class ResumableUploadViewSet(viewsets.ViewSet):
+    """
+    Create uploads, append chunks to them and tell where to resume from.
+
+    `POST {"size": ...}` creates an upload, `PUT`/`PATCH {"offset": ...,
+    "chunk": ...}` appends a chunk, `GET` returns the current offset and
+    `DELETE` discards the upload. Chunks not starting at the current offset
+    get a 409 response with the offset to resume from, chunks going beyond
+    the size of the upload a 400 one.
+
+    Uploads are limited to `max_upload_size`, 100 MiB by default.
+    """
+
+    CHUNK_TOO_LARGE_MESSAGE = _("The chunk goes beyond the size of the upload.")
+
+    lookup_value_regex = '[0-9a-f]{32}'
+    upload_store = None
+    max_upload_size = DEFAULT_MAX_UPLOAD_SIZE
+    max_chunk_size = None
+
+    def get_upload_store(self):
+        return self.upload_store or default_store
+
+    def get_upload_data(self, token):
+        store = self.get_upload_store()
+        try:
+            size = store.get_size(token)
+            offset = store.get_offset(token)
+        except UploadError:
+            raise exceptions.NotFound()
+        return {
+            'upload_token': token, 'size': size, 'offset': offset,
+            'complete': offset == size}
+
+    def create(self, request):
+        serializer = UploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        size = serializer.validated_data['size']
+        if self.max_upload_size is not None and size > self.max_upload_size:
+            raise exceptions.ValidationError({'size': [
+                fields.Base64FieldMixin.TOO_LARGE_MESSAGE.format(
+                    max_size=self.max_upload_size)]})
+        token = self.get_upload_store().create(size)
+        return response.Response(
+            self.get_upload_data(token), status=status.HTTP_201_CREATED)
+
+    def retrieve(self, request, pk=None):
+        return response.Response(self.get_upload_data(pk))
+
+    def update(self, request, pk=None):
+        serializer = UploadChunkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        chunk = serializer.validated_data['chunk']
+        if self.max_chunk_size is not None and len(chunk) > self.max_chunk_size:
+            raise exceptions.ValidationError({'chunk': [
+                fields.Base64FieldMixin.TOO_LARGE_MESSAGE.format(
+                    max_size=self.max_chunk_size)]})
+        data = self.get_upload_data(pk)
+        try:
+            self.get_upload_store().append(
+                pk, serializer.validated_data['offset'], chunk)
+        except OffsetMismatch as exc:
+            data['offset'] = exc.offset
+            return response.Response(data, status=status.HTTP_409_CONFLICT)
+        except ChunkTooLarge:
+            raise exceptions.ValidationError({'chunk': [self.CHUNK_TOO_LARGE_MESSAGE]})
+        return response.Response(self.get_upload_data(pk))
+
+    partial_update = update
+
+    def destroy(self, request, pk=None):
+        self.get_upload_data(pk)
+        self.get_upload_store().delete(pk)
+        return response.Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadTokenFieldMixin(object):
+    """
+    Also take `{"upload_token": ...}` for the file of a completed upload.
+
+    The file goes through the same checks as base64 data, and once valid
+    the token is used up. Files the field stores itself, e.g. content
+    addressed ones, are removed from the upload store right away. Others
+    are moved out of it by a file system storage once a model field saves
+    them, or left until they expire.
+    """
+
+    INVALID_UPLOAD_MESSAGE = _("The upload doesn't exist or isn't complete.")
+    UPLOAD_TOKEN_KEY = 'upload_token'
+
+    upload_store = None
+
+    def __init__(self, *args, **kwargs):
+        self.upload_store = kwargs.pop('upload_store', self.upload_store)
+        super(UploadTokenFieldMixin, self).__init__(*args, **kwargs)
+
+    def get_upload_store(self):
+        return self.upload_store or default_store
+
+    def to_internal_value(self, data):
+        if isinstance(data, dict) and list(data) == [self.UPLOAD_TOKEN_KEY]:
+            return self.to_internal_value_upload(data[self.UPLOAD_TOKEN_KEY])
+        return super(UploadTokenFieldMixin, self).to_internal_value(data)
+
+    def to_internal_value_upload(self, token):
+        store = self.get_upload_store()
+        token = six.text_type(token)
+        try:
+            data = store.open(token)
+        except UploadError:
+            raise ValidationError(self.INVALID_UPLOAD_MESSAGE)
+        try:
+            value = self.save_file(*self.validate_upload(data))
+        except Exception:
+            data.close()
+            raise
+        if isinstance(value, fields.CommittedFileMixin):
+            data.close()
+            store.delete(token)
+        else:
+            store.release(token)
+        return self.process_file(value)
+
+    def validate_upload(self, data):
+        """
+        Check a completed upload like decoded base64 data.
+
+        Returns the validated file and its digest for `save_file`.
+        """
+        self.check_decoded_size(data.size)
+        self.check_file_header(data.read(self.get_sniff_size()))
+        data.seek(0)
+
+        file_name = str(uuid.uuid4())[:12]
+        file_extension = self.get_file_extension(file_name, data)
+        data.seek(0)
+        if file_extension not in self.ALLOWED_TYPES:
+            raise ValidationError(self.INVALID_TYPE_MESSAGE)
+        data.name = file_name + "." + file_extension
+        digest = None
+        if self.content_addressed:
+            digest = hashlib.new(self.hash_algorithm)
+            for chunk in data.chunks():
+                digest.update(chunk)
+        return self.validate_file(data), digest
+
+
+class ResumableBase64FileField(UploadTokenFieldMixin, fields.Base64FileField):
+    pass
+
+
+class ResumableBase64ImageField(UploadTokenFieldMixin, fields.Base64ImageField):
+    pass
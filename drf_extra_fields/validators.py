@@ -0,0 +1,111 @@
+"""
+Validators for lists of ranges, e.g. of `fields.RangeListField`.
+
+They sort the ranges once and sweep over them, so large schedules are
+checked in O(n log n) rather than by comparing every pair. `step` is the
+distance between values of discrete ranges, e.g. 1 for integer ranges, so
+that `(1,2)` counts as empty and `[1,2]` and `[3,4]` as adjacent.
+"""
+
+from django.utils.translation import ugettext_lazy as _
+
+from rest_framework import serializers
+
+from . import ranges
+
+
+def get_all_ends(value, step=None):
+    """
+    Return the ends of the non-empty ranges of a list, see `ranges.get_ends`.
+
+    Null items, which fields with `allow_null` keep, are left out.
+    """
+    return [ends for ends in (ranges.get_ends(item, step) for item in value
+                              if item is not None)
+            if ends is not None]
+
+
+class RangesDoNotOverlap(object):
+    """
+    Check that no two ranges share a value. Adjacent ranges don't overlap.
+    """
+
+    message = _('The ranges may not overlap.')
+
+    def __init__(self, step=None, message=None):
+        self.step = step
+        self.message = message or self.message
+
+    def __call__(self, value):
+        ends = get_all_ends(value, self.step)
+        ends.sort(key=ranges.sort_key)
+        # Without overlaps each range starts after the previous one ended.
+        for previous, following in zip(ends, ends[1:]):
+            upper, upper_inc = previous[2], previous[3]
+            lower, lower_inc = following[0], following[1]
+            if upper is None or lower is None or lower < upper or (
+                    lower == upper and upper_inc and lower_inc):
+                raise serializers.ValidationError(self.message)
+
+
+class RangesWithin(object):
+    """
+    Check that all ranges are within a `parent` range.
+    """
+
+    message = _('The ranges must be within {range}.')
+
+    def __init__(self, parent, step=None, message=None):
+        self.parent = parent
+        self.step = step
+        self.message = message or self.message
+
+    def __call__(self, value):
+        parent = ranges.get_ends(self.parent, self.step)
+        for ends in get_all_ends(value, self.step):
+            if parent is None or not self.is_within(ends, parent):
+                raise serializers.ValidationError(
+                    self.message.format(range=self.format_parent()))
+
+    def format_parent(self):
+        if self.parent.isempty:
+            return ranges.EMPTY_LITERAL
+        return ranges.format_range_literal(
+            self.parent.lower, self.parent.upper,
+            ranges.get_bounds(self.parent.lower_inc, self.parent.upper_inc))
+
+    def is_within(self, ends, parent):
+        lower, lower_inc, upper, upper_inc = ends
+        parent_lower, parent_lower_inc, parent_upper, parent_upper_inc = parent
+        if parent_lower is not None and (lower is None or lower < parent_lower or (
+                lower == parent_lower and lower_inc and not parent_lower_inc)):
+            return False
+        return parent_upper is None or upper is not None and (upper < parent_upper or (
+            upper == parent_upper and (parent_upper_inc or not upper_inc)))
+
+
+class MaxRangeCoverage(object):
+    """
+    Check that the ranges cover at most `max_coverage`, e.g. a number of
+    days as a `timedelta`, counting values covered by several ranges once.
+    """
+
+    message = _('The ranges may not cover more than {max_coverage} in total.')
+
+    def __init__(self, max_coverage, step=None, message=None):
+        self.max_coverage = max_coverage
+        self.step = step
+        self.message = message or self.message
+
+    def __call__(self, value):
+        merged = ranges.merge_ranges(
+            [item for item in value if item is not None], self.step)
+        if not merged:
+            return
+        if merged[0][0] is None or merged[-1][1] is None:
+            raise serializers.ValidationError(
+                self.message.format(max_coverage=self.max_coverage))
+        lengths = [upper - lower for lower, upper, bounds in merged]
+        if sum(lengths[1:], lengths[0]) > self.max_coverage:
+            raise serializers.ValidationError(
+                self.message.format(max_coverage=self.max_coverage))
@@ -0,0 +1,119 @@
+import base64
+import copy
+import shutil
+import tempfile
+import threading
+import unittest
+
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.test import TestCase, override_settings
+
+from mock import patch
+
+from rest_framework import serializers
+
+from drf_extra_fields import compat
+from drf_extra_fields.fields import Base64Representation
+
+if compat.asyncio is not None:
+    from drf_extra_fields import aio
+
+IMAGE = 'R0lGODlhAQABAIAAAAUEBAAAACwAAAAAAQABAAACAkQBADs='
+
+
+class StoredFile(object):
+    def __init__(self, storage, name):
+        self.storage = storage
+        self.name = name
+
+
+@unittest.skipIf(compat.asyncio is None, 'asyncio is not available')
+class AsyncFieldTests(TestCase):
+
+    def setUp(self):
+        self.loop = compat.asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        compat.asyncio.set_event_loop(self.loop)
+        self.addCleanup(compat.asyncio.set_event_loop, None)
+
+    def test_to_internal_value(self):
+        """
+        Files are decoded and verified off the loop thread.
+        """
+        field = aio.AsyncBase64ImageField()
+        threads = []
+        validate_file = field.validate_file
+
+        def record_thread(data):
+            threads.append(threading.current_thread())
+            return validate_file(data)
+        field.validate_file = record_thread
+
+        images = self.loop.run_until_complete(compat.asyncio.gather(
+            field.ato_internal_value(IMAGE), field.arun_validation(IMAGE)))
+        self.assertEqual([image.read() for image in images], [base64.b64decode(IMAGE)] * 2)
+        self.assertNotIn(threading.current_thread(), threads)
+
+        with self.assertRaises(ValidationError):
+            self.loop.run_until_complete(field.ato_internal_value('abc'))
+
+    def test_to_representation(self):
+        """
+        Lazy representations are encoded in the executor too.
+        """
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        storage = FileSystemStorage(location=location)
+        name = storage.save('im.gif', ContentFile(base64.b64decode(IMAGE)))
+
+        field = aio.AsyncBase64FileField(represent_in_base64=True, lazy_representation=True)
+        self.assertIsInstance(field.to_representation(StoredFile(storage, name)), Base64Representation)
+        self.assertEqual(
+            self.loop.run_until_complete(field.ato_representation(StoredFile(storage, name))),
+            IMAGE)
+
+        self.assertEqual(aio.force_representation(
+            {'images': [Base64Representation(field, StoredFile(storage, name)), None]}),
+            {'images': [IMAGE, None]})
+
+    def test_serializer(self):
+        """
+        Whole serializers are validated and represented in the executor.
+        """
+        class ImageSerializer(serializers.Serializer):
+            image = aio.AsyncHybridImageField(represent_in_base64=True)
+
+        serializer = ImageSerializer(data={'image': IMAGE})
+        self.assertTrue(self.loop.run_until_complete(aio.ais_valid(serializer)))
+        serializer = ImageSerializer(data={'image': 'abc'})
+        with self.assertRaises(serializers.ValidationError):
+            self.loop.run_until_complete(aio.ais_valid(serializer, raise_exception=True))
+
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        storage = FileSystemStorage(location=location)
+        name = storage.save('im.gif', ContentFile(base64.b64decode(IMAGE)))
+        serializer = ImageSerializer({'image': StoredFile(storage, name)})
+        self.assertEqual(self.loop.run_until_complete(aio.adata(serializer)), {'image': IMAGE})
+
+    def test_executor(self):
+        """
+        Thread pools from the settings are used, process pools aren't.
+        """
+        executor = compat.futures.ThreadPoolExecutor(1)
+        self.addCleanup(executor.shutdown)
+        field = aio.AsyncBase64ImageField()
+        with override_settings(DRF_EXTRA_FIELDS_EXECUTOR=executor):
+            with patch.object(executor, 'submit', wraps=executor.submit) as submit:
+                self.loop.run_until_complete(field.ato_internal_value(IMAGE))
+            self.assertTrue(submit.called)
+
+        executor = compat.futures.ProcessPoolExecutor(1)
+        self.addCleanup(executor.shutdown)
+        field = copy.deepcopy(aio.AsyncBase64ImageField(executor=executor))
+        self.assertIs(field.executor, executor)
+        with patch.object(executor, 'submit') as submit:
+            self.loop.run_until_complete(field.ato_internal_value(IMAGE))
+        self.assertFalse(submit.called)
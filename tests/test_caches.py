@@ -0,0 +1,76 @@
+from django.core.cache import caches
+from django.test import TestCase
+
+from drf_extra_fields import caches as extra_caches
+
+
+class TestLRUCache(TestCase):
+    """
+    Test the in-process representation cache.
+    """
+
+    def test_get_set(self):
+        """
+        Cached values are returned and lookups are counted.
+        """
+        cache = extra_caches.LRUCache()
+        self.assertIsNone(cache.get('foo'))
+        cache.set('foo', 'bar')
+        self.assertEqual(cache.get('foo'), 'bar')
+        cache.set('foo', 'quux')
+        self.assertEqual(cache.get('foo'), 'quux')
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        self.assertEqual(cache.size, 4)
+
+    def test_eviction(self):
+        """
+        The least recently used values are evicted past the maximum size.
+        """
+        cache = extra_caches.LRUCache(max_size=6)
+        cache.set('a', 'aa')
+        cache.set('b', 'bb')
+        cache.set('c', 'cc')
+        cache.get('a')
+        cache.set('d', 'dd')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 'aa')
+        self.assertEqual(cache.get('d'), 'dd')
+        self.assertEqual(cache.size, 6)
+
+        cache.set('e', 'too long')
+        self.assertIsNone(cache.get('e'))
+        self.assertEqual(cache.size, 6)
+
+
+class TestDjangoCache(TestCase):
+    """
+    Test the representation cache delegating to Django's caches.
+    """
+
+    def tearDown(self):
+        caches['default'].clear()
+
+    def test_get_set(self):
+        """
+        Values are stored in the cache alias.
+        """
+        cache = extra_caches.DjangoCache()
+        self.assertIsNone(cache.get('foo'))
+        cache.set('foo', 'bar')
+        self.assertEqual(caches['default'].get('foo'), 'bar')
+        self.assertEqual(cache.get('foo'), 'bar')
+
+        cache = extra_caches.DjangoCache(timeout=60)
+        cache.set('baz', 'quux')
+        self.assertEqual(cache.get('baz'), 'quux')
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_not_implemented(self):
+        """
+        Cache classes must implement `get()` and `set()`.
+        """
+        cache = extra_caches.RepresentationCache()
+        with self.assertRaises(NotImplementedError):
+            cache.get('foo')
+        with self.assertRaises(NotImplementedError):
+            cache.set('foo', 'bar')
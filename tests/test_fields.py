@@ -1,28 +1,67 @@
+import copy
 import datetime
 import base64
+import hashlib
+import io
 import os
+import posixpath
+import shutil
+import tempfile
 import unittest
 
 import django
 from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import (
+    InMemoryUploadedFile,
+    TemporaryUploadedFile,
+)
+from django.http import QueryDict
 from django.test import TestCase, override_settings
+from django.utils import six
 
 from mock import patch
 import pytz
 
 from rest_framework import serializers
+from rest_framework.fields import ImageField
+from rest_framework.renderers import JSONRenderer
 
 from drf_extra_fields import compat
+from drf_extra_fields.runtests import models
+from drf_extra_fields.caches import LRUCache
+from drf_extra_fields import fields
+from drf_extra_fields import renditions
+from drf_extra_fields import signatures
 from drf_extra_fields.geo_fields import PointField
 from drf_extra_fields.fields import (
     Base64ImageField,
     Base64FileField,
+    Base64Representation,
+    CommittedFile,
     DateRangeField,
     DateTimeRangeField,
     FloatRangeField,
     HybridImageField,
+    ImageSerializerMixin,
     IntegerRangeField,
+    RangeListField,
+    DateMultiRangeField,
+    DateTimeMultiRangeField,
+    IntegerMultiRangeField,
 )
+from drf_extra_fields.renditions import Rendition, WorkerQueue
+
+
+def make_base64_image(size=(10, 10), format='PNG', frames=1):
+    from PIL import Image
+
+    images = [Image.new('RGB', size, (index * 80, 0, 0)) for index in range(frames)]
+    image_file = io.BytesIO()
+    images[0].save(
+        image_file, format, save_all=frames > 1, append_images=images[1:])
+    return base64.b64encode(image_file.getvalue()).decode()
 
 
 class UploadedBase64Image(object):
@@ -53,11 +92,58 @@ class DownloadableBase64File(object):
         self.file = self.FieldFile(path=file_path)
 
 
+class StoredFile(object):
+    def __init__(self, storage, name):
+        self.storage = storage
+        self.name = name
+
+    @property
+    def url(self):
+        return self.storage.url(self.name)
+
+    def __bool__(self):
+        return bool(self.name)
+    __nonzero__ = __bool__
+
+
+class TextBase64FileField(Base64FileField):
+    ALLOWED_TYPES = ('pdf',)
+
+    def get_file_extension(self, filename, decoded_file):
+        return 'txt'
+
+
 class UploadedBase64ImageSerializer(serializers.Serializer):
     file = Base64ImageField(required=False)
     created = serializers.DateTimeField()
 
 
+class Base64ImagePairSerializer(serializers.Serializer):
+    first = Base64ImageField(required=False)
+    second = Base64ImageField(required=False)
+
+
+class DocumentMetadataSerializer(ImageSerializerMixin, serializers.ModelSerializer):
+    image = Base64ImageField(required=False, metadata_fields={
+        'width': 'image_width',
+        'height': 'image_height',
+        'format': 'image_format',
+        'digest': 'image_digest',
+    })
+
+    class Meta:
+        model = models.Document
+        fields = ('id', 'image')
+
+
+class DocumentRenditionSerializer(ImageSerializerMixin, serializers.ModelSerializer):
+    image = Base64ImageField(required=False, renditions=[Rendition('thumb', (4, 4))])
+
+    class Meta:
+        model = models.Document
+        fields = ('id', 'image')
+
+
 class DownloadableBase64ImageSerializer(serializers.Serializer):
     image = Base64ImageField(represent_in_base64=True)
 
@@ -132,18 +218,604 @@ class Base64ImageSerializerTests(TestCase):
         finally:
             os.remove('im.jpg')
 
+    def test_download_from_storage(self):
+        """
+        Stored files are read through their storage, in chunks.
+        """
+        encoded_source = 'R0lGODlhAQABAIAAAAUEBAAAACwAAAAAAQABAAACAkQBADs='
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        storage = FileSystemStorage(location=location)
+        name = storage.save('im.gif', ContentFile(base64.b64decode(encoded_source)))
+
+        field = Base64ImageField(represent_in_base64=True)
+        self.assertEqual(field.to_representation(StoredFile(storage, name)), encoded_source)
+        self.assertIsNone(field.to_representation(StoredFile(storage, '')))
+        with self.assertRaises(IOError):
+            field.to_representation(StoredFile(storage, 'missing.gif'))
+        with storage.open(name) as stored:
+            chunks = list(fields.b64encode_chunks(stored, 3))
+        self.assertEqual(len(chunks), 12)
+        self.assertEqual(''.join(chunks), encoded_source)
+
+        class ShortReads(io.BytesIO):
+            def read(self, size=-1):
+                return super(ShortReads, self).read(min(size, 2))
+
+        chunks = list(fields.b64encode_chunks(ShortReads(base64.b64decode(encoded_source)), 3))
+        self.assertEqual(''.join(chunks), encoded_source)
+        self.assertFalse([chunk for chunk in chunks[:-1] if '=' in chunk])
+
+    def test_lazy_download(self):
+        """
+        The lazy representation is only encoded when rendered.
+        """
+        encoded_source = 'R0lGODlhAQABAIAAAAUEBAAAACwAAAAAAQABAAACAkQBADs='
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        storage = FileSystemStorage(location=location)
+        name = storage.save('im.gif', ContentFile(base64.b64decode(encoded_source)))
+
+        field = Base64ImageField(represent_in_base64=True, lazy_representation=True)
+        with patch.object(storage, 'open', wraps=storage.open) as open_patch:
+            representation = field.to_representation(StoredFile(storage, name))
+            self.assertIsInstance(representation, Base64Representation)
+            self.assertFalse(open_patch.called)
+            self.assertEqual(''.join(representation.chunks()), encoded_source)
+        self.assertEqual(
+            JSONRenderer().render({'image': representation}),
+            b'{"image":"' + encoded_source.encode() + b'"}')
+
+    def test_representation_cache(self):
+        """
+        Encoded files are cached until they change.
+        """
+        encoded_source = 'R0lGODlhAQABAIAAAAUEBAAAACwAAAAAAQABAAACAkQBADs='
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        storage = FileSystemStorage(location=location)
+        name = storage.save('im.gif', ContentFile(base64.b64decode(encoded_source)))
+        stored = StoredFile(storage, name)
+
+        cache = LRUCache()
+        field = Base64ImageField(represent_in_base64=True, representation_cache=cache)
+        with patch.object(storage, 'open', wraps=storage.open) as open_patch:
+            self.assertEqual(field.to_representation(stored), encoded_source)
+            self.assertEqual(field.to_representation(stored), encoded_source)
+        self.assertEqual(open_patch.call_count, 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        with open(os.path.join(location, name), 'ab') as changed:
+            changed.write(b'\0\0\0')
+        self.assertEqual(
+            field.to_representation(stored),
+            base64.b64encode(base64.b64decode(encoded_source) + b'\0\0\0').decode())
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+        with open('im.jpg', 'wb') as im_file:
+            im_file.write(base64.b64decode(encoded_source))
+        try:
+            image = DownloadableBase64Image(os.path.abspath('im.jpg'))
+            self.assertEqual(field.to_representation(image.image), encoded_source)
+            self.assertEqual(field.to_representation(image.image), encoded_source)
+        finally:
+            os.remove('im.jpg')
+        self.assertEqual((cache.hits, cache.misses), (2, 3))
+
+    def test_representation_cache_storages(self):
+        """
+        Same named files of storages of one class are cached apart.
+        """
+        field = Base64ImageField(represent_in_base64=True, representation_cache=LRUCache())
+        files = []
+        for content in (b'GIF89a first', b'GIF89a other'):
+            location = tempfile.mkdtemp()
+            self.addCleanup(shutil.rmtree, location)
+            storage = FileSystemStorage(location=location)
+            storage.save('im.gif', ContentFile(content))
+            os.utime(os.path.join(location, 'im.gif'), (0, 0))
+            files.append(StoredFile(storage, 'im.gif'))
+        self.assertNotEqual(
+            field.get_representation_cache_key(files[0]),
+            field.get_representation_cache_key(files[1]))
+        self.assertEqual(
+            [field.to_representation(file) for file in files],
+            [base64.b64encode(b'GIF89a first').decode(), base64.b64encode(b'GIF89a other').decode()])
+        self.assertEqual(
+            field.get_storage_key(FileSystemStorage(location='/a')),
+            field.get_storage_key(FileSystemStorage(location='/a')))
+
+    def test_inline_max_size(self):
+        """
+        Only files up to `inline_max_size` are inlined, others are URLs.
+        """
+        encoded_source = 'R0lGODlhAQABAIAAAAUEBAAAACwAAAAAAQABAAACAkQBADs='
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        storage = FileSystemStorage(location=location, base_url='/media/')
+        small = storage.save('small.gif', ContentFile(base64.b64decode(encoded_source)))
+        large = storage.save('large.gif', ContentFile(b'GIF89a' + b'\0' * 100))
+
+        field = Base64ImageField(inline_max_size=50)
+        with patch.object(storage, 'open', wraps=storage.open) as open_patch:
+            self.assertEqual(field.to_representation(StoredFile(storage, small)), encoded_source)
+            self.assertEqual(
+                field.to_representation(StoredFile(storage, large)), '/media/large.gif')
+        self.assertEqual(open_patch.call_count, 1)
+
+        field = Base64ImageField(inline_max_size=50, data_uri=True)
+        self.assertEqual(
+            field.to_representation(StoredFile(storage, small)),
+            'data:image/gif;base64,' + encoded_source)
+
+        with open('im.jpg', 'wb') as im_file:
+            im_file.write(base64.b64decode(encoded_source))
+        try:
+            image = DownloadableBase64Image(os.path.abspath('im.jpg'))
+            self.assertEqual(
+                field.to_representation(image.image),
+                'data:image/jpeg;base64,' + encoded_source)
+        finally:
+            os.remove('im.jpg')
+
     def test_hybrid_image_field(self):
         field = HybridImageField()
-        with patch('drf_extra_fields.fields.Base64FieldMixin') as mixin_patch:
-            field.to_internal_value({})
-            self.assertTrue(mixin_patch.to_internal_value.called)
+        with patch('drf_extra_fields.fields.ImageField') as image_patch:
+            self.assertIsNone(field.to_internal_value({}))
+            with self.assertRaises(ValidationError):
+                field.to_internal_value('foobar')
+            self.assertFalse(image_patch.to_internal_value.called)
+
+        file = InMemoryUploadedFile(
+            io.BytesIO(base64.b64decode(make_base64_image())), None, 'im.png',
+            'image/png', 100, None)
+        with patch.object(fields.Base64FieldMixin, 'to_internal_value') as mixin_patch:
+            self.assertIs(field.to_internal_value(file), file)
+        self.assertFalse(mixin_patch.called)
+        self.assertEqual(file.image.size, (10, 10))
+        self.assertIsNotNone(field.to_internal_value(
+            bytearray(base64.b64decode(make_base64_image()))))
+        with self.assertRaises(ValidationError):
+            field.to_internal_value(ContentFile(b'foobar', name='im.png'))
+
+    def test_hybrid_image_field_temporary_file(self):
+        """
+        Temporary uploaded files are verified on disk, not read into memory.
+        """
+        file = TemporaryUploadedFile('im.png', 'image/png', 0, None)
+        self.addCleanup(file.close)
+        file.write(base64.b64decode(make_base64_image(size=(3, 2))))
+        file.size = file.tell()
+        file.seek(0)
+        with patch.object(file.file, 'read', side_effect=AssertionError) as read_patch:
+            for fast_verify in (False, True):
+                image = HybridImageField(fast_verify=fast_verify).to_internal_value(file)
+                self.assertIs(image, file)
+                self.assertEqual(image.image.size, (3, 2))
+        self.assertFalse(read_patch.called)
+
+        with self.assertRaises(ValidationError):
+            HybridImageField(max_decoded_size=10).to_internal_value(file)
+
+    def test_hybrid_image_field_storage(self):
+        """
+        Uploaded files are stored and rendered like base64 ones.
+        """
+        content = base64.b64decode(make_base64_image(size=(8, 8)))
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        storage = FileSystemStorage(location=location)
+        field = HybridImageField(
+            content_addressed=True, storage=storage,
+            renditions=[Rendition('thumb', (4, 4))])
+        image = field.to_internal_value(
+            InMemoryUploadedFile(io.BytesIO(content), None, 'im.png', 'image/png', len(content), None))
+        self.assertIsInstance(image, fields.CommittedImageFile)
+        digest = hashlib.sha256(content).hexdigest()
+        self.assertEqual(image.name, digest + '.png')
+        field.make_renditions(image)
+        self.assertTrue(storage.exists('renditions/{0}/thumb.png'.format(digest)))
+
+    def test_sniffed_type_rejected_before_decoding(self):
+        """
+        Disallowed types are rejected after decoding only the header.
+        """
+        file = base64.b64encode(b'BM' + b'\0' * 1000).decode()
+        field = Base64ImageField()
+        with patch('drf_extra_fields.fields.base64.b64decode',
+                   wraps=base64.b64decode) as decode_patch:
+            with self.assertRaises(ValidationError) as exc_info:
+                field.to_internal_value(file)
+        self.assertEqual(
+            exc_info.exception.messages,
+            ["The type of the image couldn't be determined."])
+        self.assertEqual(decode_patch.call_count, 1)
+        self.assertEqual(
+            len(decode_patch.call_args[0][0]),
+            -(-signatures.registry.max_length // 3) * 4)
+
+    def test_custom_file_extension(self):
+        """
+        Subclasses telling the type from the whole file aren't sniffed.
+        """
+        class SVGBase64ImageField(Base64ImageField):
+            ALLOWED_TYPES = ('svg',)
 
-        with patch('drf_extra_fields.fields.Base64FieldMixin') as mixin_patch:
-            mixin_patch.to_internal_value.side_effect = ValidationError('foobar')
-            with patch('drf_extra_fields.fields.ImageField') as image_patch:
-                field.to_internal_value({})
-                self.assertTrue(mixin_patch.to_internal_value.called)
-                self.assertTrue(image_patch.to_internal_value.called)
+            def get_file_extension(self, filename, decoded_file):
+                if b'<svg' in decoded_file:
+                    return 'svg'
+
+            def validate_file(self, data):
+                return data
+
+        svg = b'<?xml version="1.0"?>' + b' ' * 300 + b'<svg/>'
+        image = SVGBase64ImageField().to_internal_value(base64.b64encode(svg).decode())
+        self.assertTrue(image.name.endswith('.svg'))
+
+    def test_max_decoded_size(self):
+        """
+        Payloads decoding beyond `max_decoded_size` are rejected undecoded.
+        """
+        file = 'R0lGODlhAQABAIAAAP///////yH5BAEKAAEALAAAAAABAAEAAAICTAEAOw=='
+        self.assertIsNotNone(
+            Base64ImageField(max_decoded_size=43).to_internal_value(file))
+        field = Base64ImageField(max_decoded_size=42)
+        with patch('drf_extra_fields.fields.base64.b64decode') as decode_patch:
+            with self.assertRaises(ValidationError) as exc_info:
+                field.to_internal_value(file)
+        self.assertFalse(decode_patch.called)
+        self.assertEqual(
+            exc_info.exception.messages,
+            ['The file may not be larger than 42 bytes.'])
+
+    def test_total_decoded_size_budget(self):
+        """
+        All base64 fields of a serializer share the request budget.
+        """
+        file = 'R0lGODlhAQABAIAAAP///////yH5BAEKAAEALAAAAAABAAEAAAICTAEAOw=='
+        serializer = Base64ImagePairSerializer(
+            data={'first': file, 'second': file},
+            context={'max_total_decoded_size': 86})
+        self.assertTrue(serializer.is_valid())
+
+        serializer = Base64ImagePairSerializer(
+            data={'first': file, 'second': file},
+            context={'max_total_decoded_size': 85})
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors, {'second': [
+            'The files in this request may not be larger than 85 bytes in total.']})
+
+        with override_settings(DRF_EXTRA_FIELDS_MAX_TOTAL_DECODED_SIZE=42):
+            serializer = Base64ImagePairSerializer(data={'first': file})
+            self.assertFalse(serializer.is_valid())
+
+    def test_fast_verify(self):
+        """
+        Fast verification reads the image header instead of verifying it all.
+        """
+        field = Base64ImageField(fast_verify=True)
+        with patch.object(ImageField, 'to_internal_value') as verify_patch:
+            image = field.to_internal_value(make_base64_image())
+        self.assertFalse(verify_patch.called)
+        self.assertEqual(image.image.size, (10, 10))
+        self.assertEqual(image.content_type, 'image/png')
+
+        truncated = base64.b64encode(b'\x89PNG\r\n\x1a\n' + b'\0' * 32).decode()
+        with self.assertRaises(ValidationError) as exc_info:
+            field.to_internal_value(truncated)
+        self.assertEqual(exc_info.exception.messages, [
+            'Upload a valid image. The file you uploaded was either '
+            'not an image or a corrupted image.'])
+
+    def test_pixel_and_frame_limits(self):
+        """
+        Images with too many pixels or frames are rejected from the header.
+        """
+        for fast_verify in (False, True):
+            field = Base64ImageField(fast_verify=fast_verify, max_pixels=100)
+            self.assertIsNotNone(field.to_internal_value(make_base64_image()))
+            with self.assertRaises(ValidationError) as exc_info:
+                field.to_internal_value(make_base64_image(size=(10, 11)))
+            self.assertEqual(
+                exc_info.exception.messages,
+                ['The image may not have more than 100 pixels.'])
+
+            field = Base64ImageField(fast_verify=fast_verify, max_frames=2)
+            animation = make_base64_image(format='GIF', frames=2)
+            self.assertIsNotNone(field.to_internal_value(animation))
+            animation = make_base64_image(format='GIF', frames=3)
+            with self.assertRaises(ValidationError) as exc_info:
+                field.to_internal_value(animation)
+            self.assertEqual(
+                exc_info.exception.messages,
+                ['The image may not have more than 2 frames.'])
+
+    def test_frames_counted_up_to_limit(self):
+        """
+        Frames are only counted one past `max_frames`, and only with it.
+        """
+        from PIL import GifImagePlugin
+
+        animation = make_base64_image(format='GIF', frames=6)
+        with patch.object(GifImagePlugin.GifImageFile, 'seek',
+                          autospec=True, side_effect=GifImagePlugin.GifImageFile.seek) as seek:
+            Base64ImageField(metadata_store=LRUCache()).to_internal_value(animation)
+            self.assertFalse([call for call in seek.call_args_list if call[0][1]])
+            with self.assertRaises(ValidationError):
+                Base64ImageField(max_frames=2).to_internal_value(animation)
+        self.assertEqual(max(call[0][1] for call in seek.call_args_list), 2)
+
+    def test_limits_on_temporary_file(self):
+        """
+        Spooled images are opened from their temporary file.
+        """
+        field = Base64ImageField(
+            stream_decoding=True, max_memory_size=10, fast_verify=True)
+        image = field.to_internal_value(make_base64_image())
+        self.assertIsInstance(image, TemporaryUploadedFile)
+        self.assertEqual(image.image.size, (10, 10))
+
+    def test_binary_input(self):
+        """
+        Raw bytes from binary parsers are taken without base64.
+        """
+        decoded = base64.b64decode(
+            'R0lGODlhAQABAIAAAP///////yH5BAEKAAEALAAAAAABAAEAAAICTAEAOw==')
+        field = Base64ImageField()
+        for data in (decoded, bytearray(decoded), memoryview(decoded)):
+            image = field.to_internal_value(data)
+            self.assertTrue(image.name.endswith('.gif'))
+            self.assertEqual(image.read(), decoded)
+
+        image = field.to_internal_value(memoryview(b'..' + decoded)[2:])
+        self.assertEqual(image.read(), decoded)
+
+        with patch('drf_extra_fields.fields.ContentFile') as file_patch:
+            with self.assertRaises(ValidationError) as exc_info:
+                field.to_internal_value(b'BM' + b'\0' * 100)
+        self.assertFalse(file_patch.called)
+        self.assertEqual(
+            exc_info.exception.messages,
+            ["The type of the image couldn't be determined."])
+        with self.assertRaises(ValidationError) as exc_info:
+            Base64ImageField(max_decoded_size=42).to_internal_value(decoded)
+        self.assertEqual(
+            exc_info.exception.messages,
+            ['The file may not be larger than 42 bytes.'])
+
+    @unittest.skipIf(six.PY2, 'memoryview.cast is not available')
+    def test_multidimensional_binary_input(self):
+        decoded = base64.b64decode(
+            'R0lGODlhAQABAIAAAP///////yH5BAEKAAEALAAAAAABAAEAAAICTAEAOw==')
+        image = Base64ImageField().to_internal_value(
+            memoryview(bytearray(decoded)).cast('B', (1, len(decoded))))
+        self.assertEqual(image.read(), decoded)
+
+    def test_stream_decoding(self):
+        """
+        Stream decoding spools small files in memory.
+        """
+        file = 'R0lGODlhAQABAIAAAP///////yH5BAEKAAEALAAAAAABAAEAAAICTAEAOw=='
+        field = Base64ImageField(stream_decoding=True, decode_chunk_size=8)
+        image = field.to_internal_value(file)
+        self.assertIsInstance(image, InMemoryUploadedFile)
+        self.assertTrue(image.name.endswith('.gif'))
+        self.assertEqual(image.read(), base64.b64decode(file))
+
+    def test_stream_decoding_to_disk(self):
+        """
+        Stream decoding rolls over to a temporary file above the threshold.
+        """
+        file = 'R0lGODlhAQABAIAAAP///////yH5BAEKAAEALAAAAAABAAEAAAICTAEAOw=='
+        field = Base64ImageField(
+            stream_decoding=True, decode_chunk_size=8, max_memory_size=10)
+        image = field.to_internal_value(
+            'data:image/gif;base64,' + file[:30] + '\n' + file[30:])
+        self.assertIsInstance(image, TemporaryUploadedFile)
+        self.assertEqual(image.size, len(base64.b64decode(file)))
+        with open(image.temporary_file_path(), 'rb') as decoded:
+            self.assertEqual(decoded.read(), base64.b64decode(file))
+
+    def test_decoding_validation_errors(self):
+        """
+        Both decoding modes reject invalid base64 and disallowed types.
+        """
+        file = 'R0lGODlhAQABAIAAAP///////yH5BAEKAAEALAAAAAABAAEAAAICTAEAOw=='
+        truncated = base64.b64encode(base64.b64decode(file) + b'\0' * 599).decode() + 'A'
+        for stream_decoding in (False, True):
+            field = Base64ImageField(stream_decoding=stream_decoding)
+            with self.assertRaises(ValidationError) as exc_info:
+                field.to_internal_value(truncated)
+            self.assertEqual(exc_info.exception.messages, ['Please upload a valid image.'])
+
+            field = TextBase64FileField(stream_decoding=stream_decoding)
+            with self.assertRaises(ValidationError) as exc_info:
+                field.to_internal_value(file)
+            self.assertEqual(
+                exc_info.exception.messages,
+                ["The type of the file couldn't be determined."])
+
+    def test_validation_error_with_non_string(self):
+        """
+        Passing something other than a string should raise a validation error.
+        """
+        with self.assertRaises(ValidationError) as exc_info:
+            Base64ImageField().to_internal_value(123)
+        self.assertEqual(exc_info.exception.messages, ['This is not an base64 string'])
+
+    def test_renditions(self):
+        """
+        Renditions are stored next to each other and represented by URL.
+        """
+        from PIL import Image
+
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        storage = FileSystemStorage(location=location, base_url='/media/')
+        field = Base64ImageField(storage=storage, renditions=[
+            Rendition('thumb', (4, 4), format='JPEG', quality=80),
+            Rendition('small', (8, 8))])
+        image = field.to_internal_value(make_base64_image(size=(16, 8)))
+        self.assertEqual(image.read(), base64.b64decode(make_base64_image(size=(16, 8))))
+        self.assertFalse(storage.exists('renditions'))
+
+        name = storage.save('photos/' + image.name, image)
+        base_name = os.path.splitext(posixpath.basename(name))[0]
+        field.make_renditions(StoredFile(storage, name))
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(location, 'renditions', base_name))),
+            ['small.png', 'thumb.jpg'])
+        with storage.open('renditions/{0}/thumb.jpg'.format(base_name)) as thumb:
+            self.assertEqual(Image.open(thumb).size, (4, 2))
+
+        # Rendering again replaces the renditions.
+        storage.delete(name)
+        storage.save(name, ContentFile(base64.b64decode(make_base64_image(size=(4, 4)))))
+        field.save_renditions(storage, name)
+        with storage.open('renditions/{0}/small.png'.format(base_name)) as small:
+            self.assertEqual(Image.open(small).size, (4, 4))
+
+        self.assertEqual(field.to_representation(StoredFile(storage, name)), {
+            'file': '/media/' + name,
+            'renditions': {
+                'thumb': '/media/renditions/{0}/thumb.jpg'.format(base_name),
+                'small': '/media/renditions/{0}/small.png'.format(base_name)}})
+        self.assertIsNone(field.to_representation(StoredFile(storage, '')))
+        self.assertIsNone(field.to_internal_value(''))
+
+    def test_metadata_fields(self):
+        """
+        Image metadata goes to sibling fields and is represented from them.
+        """
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        content = base64.b64decode(make_base64_image(size=(3, 2)))
+
+        with override_settings(MEDIA_ROOT=location):
+            serializer = DocumentMetadataSerializer(
+                data={'image': make_base64_image(size=(3, 2))})
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+            document = serializer.save()
+            document = models.Document.objects.get(pk=document.pk)
+            self.assertEqual(
+                (document.image_width, document.image_height, document.image_format),
+                (3, 2, 'PNG'))
+            self.assertEqual(document.image_digest, hashlib.sha256(content).hexdigest())
+
+            with patch.object(FileSystemStorage, 'open') as open_patch:
+                data = DocumentMetadataSerializer(document).data
+            self.assertFalse(open_patch.called)
+            self.assertEqual(data['image'], {
+                'file': document.image.url,
+                'metadata': {
+                    'width': 3, 'height': 2, 'format': 'PNG',
+                    'digest': hashlib.sha256(content).hexdigest()}})
+
+            serializer = DocumentMetadataSerializer(
+                document, data={'image': ''}, partial=True)
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+            document = models.Document.objects.get(pk=serializer.save().pk)
+            self.assertFalse(document.image)
+            self.assertEqual(
+                (document.image_width, document.image_height,
+                 document.image_format, document.image_digest),
+                (None, None, '', ''))
+            self.assertIsNone(DocumentMetadataSerializer(models.Document()).data['image'])
+
+    def test_metadata_fields_need_serializer_mixin(self):
+        class Serializer(serializers.ModelSerializer):
+            image = Base64ImageField(metadata_fields={'width': 'image_width'})
+
+            class Meta:
+                model = models.Document
+                fields = ('id', 'image')
+
+        with self.assertRaises(AssertionError):
+            Serializer().fields
+
+    def test_metadata_store(self):
+        """
+        Image metadata can be kept in a cache by file name instead.
+        """
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        storage = FileSystemStorage(location=location)
+        store = LRUCache()
+        field = Base64ImageField(
+            metadata_store=store, content_addressed=True, storage=storage)
+        content = base64.b64decode(make_base64_image(size=(3, 2), format='GIF'))
+        image = field.to_internal_value(make_base64_image(size=(3, 2), format='GIF'))
+        self.assertEqual(image.metadata, {
+            'width': 3, 'height': 2, 'format': 'GIF', 'size': len(content),
+            'digest': hashlib.sha256(content).hexdigest()})
+
+        with patch.object(storage, 'open') as open_patch:
+            representation = field.to_representation(StoredFile(storage, 'images/' + image.name))
+        self.assertFalse(open_patch.called)
+        self.assertEqual(representation['metadata'], image.metadata)
+
+        # The header is read when no verification did.
+        field = Base64ImageField(metadata_store=store, fast_verify=True)
+        with patch.object(field, 'validate_file', side_effect=lambda data: data):
+            image = field.to_internal_value(make_base64_image())
+        self.assertEqual(store.get(field.get_metadata_key(image.name))['width'], 10)
+
+    def test_deferred_renditions(self):
+        """
+        Deferred renditions are made by a background worker.
+        """
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        storage = FileSystemStorage(location=location)
+        queue = WorkerQueue()
+        field = Base64ImageField(
+            storage=storage, renditions=[Rendition('thumb', (4, 4))],
+            defer_renditions=True, rendition_queue=queue, rendition_upload_to='derived')
+        name = storage.save('im.png', ContentFile(base64.b64decode(make_base64_image())))
+        with patch.object(field, 'save_renditions') as save_renditions:
+            field.make_renditions(StoredFile(storage, name))
+            queue.join()
+        save_renditions.assert_called_once_with(storage, name)
+        self.assertFalse(os.path.exists(os.path.join(location, 'derived')))
+
+        field.make_renditions(StoredFile(storage, name))
+        queue.join()
+        self.assertEqual(os.listdir(os.path.join(location, 'derived')), ['im'])
+
+        with patch.object(renditions, 'default_queue') as default_queue:
+            Base64ImageField(
+                renditions=[Rendition('thumb', (4, 4))],
+                defer_renditions=True).make_renditions(StoredFile(storage, name))
+        self.assertTrue(default_queue.put.called)
+
+    def test_renditions_on_save(self):
+        """
+        Renditions are made when saving, after the committed file name.
+        """
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+
+        with override_settings(MEDIA_ROOT=location):
+            serializer = DocumentRenditionSerializer(data={'image': 'abc'})
+            self.assertFalse(serializer.is_valid())
+            serializer = DocumentRenditionSerializer(data={'image': make_base64_image()})
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+            self.assertFalse(os.path.exists(os.path.join(location, 'renditions')))
+
+            document = serializer.save()
+            base_name = os.path.splitext(document.image.name)[0]
+            self.assertTrue(document.image.storage.exists(
+                'renditions/{0}/thumb.png'.format(base_name)))
+            self.assertEqual(
+                DocumentRenditionSerializer(document).data['image']['renditions'],
+                {'thumb': document.image.storage.url('renditions/{0}/thumb.png'.format(base_name))})
+
+            serializer = DocumentRenditionSerializer(
+                document, data={'image': ''}, partial=True)
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+            with patch.object(Base64ImageField, 'make_renditions') as make_renditions:
+                serializer.save()
+            self.assertFalse(make_renditions.called)
 
 
 class PDFBase64FileField(Base64FileField):
@@ -153,6 +825,10 @@ class PDFBase64FileField(Base64FileField):
         return 'pdf'
 
 
+class SignatureBase64FileField(Base64FileField):
+    ALLOWED_TYPES = ('pdf',)
+
+
 class UploadedBase64FileSerializer(serializers.Serializer):
     file = PDFBase64FileField(required=False)
     created = serializers.DateTimeField()
@@ -218,6 +894,147 @@ class Base64FileSerializerTests(TestCase):
             serializer.validated_data['created'], uploaded_file.created)
         self.assertIsNone(serializer.validated_data['file'])
 
+    def test_signature_file_extension(self):
+        """
+        The file type is told from the signature registry by default.
+        """
+        field = SignatureBase64FileField()
+        pdf = field.to_internal_value(base64.b64encode(b'%PDF-1.4\n%%EOF\n').decode())
+        self.assertTrue(pdf.name.endswith('.pdf'))
+        with self.assertRaises(ValidationError):
+            field.to_internal_value(
+                'R0lGODlhAQABAIAAAP///////yH5BAEKAAEALAAAAAABAAEAAAICTAEAOw==')
+
+    def test_sniffed_type_rejected_before_decoding(self):
+        """
+        Known disallowed types are rejected from the header, unknown ones
+        and fields with their own `get_file_extension` decode the file.
+        """
+        png = base64.b64encode(b'\x89PNG\r\n\x1a\n' + b'\0' * 1000).decode()
+        with patch('drf_extra_fields.fields.base64.b64decode',
+                   wraps=base64.b64decode) as decode_patch:
+            with self.assertRaises(ValidationError) as exc_info:
+                SignatureBase64FileField().to_internal_value(png)
+        self.assertEqual(
+            exc_info.exception.messages, ["The type of the file couldn't be determined."])
+        self.assertEqual(decode_patch.call_count, 1)
+
+        field = SignatureBase64FileField()
+        self.assertIsNone(field.sniff_file_extension(b'unknown'))
+        self.assertIsNone(PDFBase64FileField().sniff_file_extension(base64.b64decode(png)))
+        self.assertTrue(PDFBase64FileField().to_internal_value(png).name.endswith('.pdf'))
+
+    def test_content_addressed(self):
+        """
+        Identical files are stored once, named by their digest.
+        """
+        content = b'%PDF-1.4\n%%EOF\n'
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        with override_settings(MEDIA_ROOT=location):
+            for stream_decoding in (False, True):
+                field = SignatureBase64FileField(
+                    content_addressed=True, upload_to='docs', stream_decoding=stream_decoding)
+                first = field.to_internal_value(base64.b64encode(content).decode())
+                second = field.to_internal_value(base64.b64encode(content).decode())
+                self.assertIsInstance(first, CommittedFile)
+                self.assertEqual(
+                    first.name, 'docs/' + hashlib.sha256(content).hexdigest() + '.pdf')
+                self.assertEqual(second.name, first.name)
+                self.assertEqual(os.listdir(os.path.join(location, 'docs')), [
+                    hashlib.sha256(content).hexdigest() + '.pdf'])
+
+            document = models.Document(file=first)
+            document.save()
+            document = models.Document.objects.get(pk=document.pk)
+            self.assertEqual(document.file.name, first.name)
+            self.assertEqual(document.file.read(), content)
+            self.assertEqual(len(os.listdir(os.path.join(location, 'docs'))), 1)
+
+            image = Base64ImageField(content_addressed=True).to_internal_value(
+                make_base64_image(size=(3, 2)))
+            document = models.Document(image=image)
+            document.save()
+            self.assertEqual((document.image.width, document.image.height), (3, 2))
+
+    def test_stream_to_storage(self):
+        """
+        Decoded chunks are written straight to storage and left committed.
+        """
+        content = b'%PDF-1.4\n' + b'0' * 100000 + b'\n%%EOF\n'
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        storage = FileSystemStorage(location=location)
+        field = SignatureBase64FileField(
+            stream_to_storage=True, storage=storage, upload_to='docs',
+            decode_chunk_size=4096)
+        with patch.object(fields, 'ContentFile') as content_file:
+            stored = field.to_internal_value(base64.b64encode(content).decode())
+        self.assertFalse(content_file.called)
+        self.assertIsInstance(stored, CommittedFile)
+        self.assertTrue(stored.name.startswith('docs/'))
+        self.assertTrue(stored.name.endswith('.pdf'))
+        self.assertEqual(storage.open(stored.name).read(), content)
+
+        # Binary input is stored under its own name too.
+        stored = field.to_internal_value(content)
+        self.assertIsInstance(stored, CommittedFile)
+        self.assertEqual(len(os.listdir(os.path.join(location, 'docs'))), 2)
+
+        with self.assertRaises(AssertionError):
+            SignatureBase64FileField(stream_to_storage=True, content_addressed=True)
+
+    def test_streamed_file(self):
+        """
+        Storages may read streamed files as well as write their chunks.
+        """
+        streamed = fields.StreamedFile([b'abc', b'def', b'gh'], 'name', 8)
+        streamed.seek(0)
+        self.assertTrue(streamed.multiple_chunks())
+        self.assertEqual(streamed.read(4), b'abcd')
+        self.assertEqual(streamed.tell(), 4)
+        with self.assertRaises(io.UnsupportedOperation):
+            streamed.seek(0)
+        self.assertEqual(list(streamed.chunks()), [b'ef', b'gh'])
+        self.assertEqual(streamed.read(), b'')
+        streamed.close()
+
+        streamed = fields.StreamedFile([b'abc', b'def'])
+        self.assertEqual(streamed.read(), b'abcdef')
+        self.assertEqual(streamed.tell(), 6)
+
+    def test_stream_to_storage_invalid(self):
+        """
+        Files failing to decode or validate are removed from storage.
+        """
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        storage = FileSystemStorage(location=location)
+        truncated = base64.b64encode(b'%PDF-1.4\n' + b'\0' * 599).decode()[:-1]
+        with self.assertRaises(ValidationError) as exc_info:
+            SignatureBase64FileField(
+                stream_to_storage=True, storage=storage,
+                decode_chunk_size=16).to_internal_value(truncated)
+        self.assertEqual(exc_info.exception.messages, ['Please upload a valid file.'])
+        self.assertEqual(os.listdir(location), [])
+
+        # The header of a text file is inconclusive, the stored file isn't.
+        with self.assertRaises(ValidationError) as exc_info:
+            TextBase64FileField(stream_to_storage=True, storage=storage).to_internal_value(
+                base64.b64encode(b'plain text').decode())
+        self.assertEqual(
+            exc_info.exception.messages, ["The type of the file couldn't be determined."])
+        self.assertEqual(os.listdir(location), [])
+
+        image_field = Base64ImageField(stream_to_storage=True, storage=storage)
+        image = image_field.to_internal_value(make_base64_image(size=(3, 2)))
+        self.assertEqual(image.image.size, (3, 2))
+        broken = base64.b64encode(
+            base64.b64decode(make_base64_image())[:40]).decode()
+        with self.assertRaises(ValidationError):
+            image_field.to_internal_value(broken)
+        self.assertEqual(os.listdir(location), [image.name])
+
     def test_download(self):
         encoded_source = 'R0lGODlhAQABAIAAAAUEBAAAACwAAAAAAQABAAACAkQBADs='
 
@@ -232,6 +1049,330 @@ class Base64FileSerializerTests(TestCase):
             os.remove('im.jpg')
 
 
+def make_zip(members):
+    import zipfile
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for name, content in members:
+            zip_file.writestr(name, content)
+    return archive.getvalue()
+
+
+def make_tar(members, mode='w:gz'):
+    import tarfile
+
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode=mode) as tar_file:
+        for name, content in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar_file.addfile(info, io.BytesIO(content))
+        directory = tarfile.TarInfo('directory')
+        directory.type = tarfile.DIRTYPE
+        tar_file.addfile(directory)
+    return archive.getvalue()
+
+
+class Base64ArchiveFieldTests(TestCase):
+    PDF = b'%PDF-1.4\n%%EOF\n'
+
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location)
+        self.storage = FileSystemStorage(location=self.location, base_url='/media/')
+
+    def stored(self):
+        return sorted(
+            os.path.relpath(os.path.join(directory, name), self.location)
+            for directory, directories, names in os.walk(self.location)
+            for name in names)
+
+    def test_zip(self):
+        """
+        Each member of an archive is stored in a directory named after it.
+        """
+        field = fields.Base64ArchiveField(storage=self.storage, upload_to='bundles')
+        members = field.to_internal_value(base64.b64encode(make_zip([
+            ('docs/a.pdf', self.PDF), ('docs/', b''), ('./b c.txt', b'text')])).decode())
+        self.assertEqual([member.member_name for member in members], ['docs/a.pdf', './b c.txt'])
+        directory = os.path.dirname(os.path.dirname(members[0].name))
+        self.assertTrue(directory.startswith('bundles/'))
+        self.assertEqual(self.stored(), [
+            directory + '/b_c.txt', directory + '/docs/a.pdf'])
+        self.assertEqual(self.storage.open(members[0].name).read(), self.PDF)
+        self.assertEqual(field.to_representation(members), [
+            '/media/' + members[0].name, '/media/' + members[1].name])
+        self.assertIsNone(field.to_internal_value(''))
+
+    def test_tar(self):
+        """
+        Plain and compressed tar archives are read member by member.
+        """
+        for mode in ('w', 'w:gz', 'w:bz2'):
+            field = fields.Base64ArchiveField(storage=self.storage, member_types=['pdf'])
+            members = field.to_internal_value(make_tar([('a.pdf', self.PDF)], mode))
+            self.assertEqual(len(members), 1)
+            self.assertEqual(self.storage.open(members[0].name).read(), self.PDF)
+
+    def test_member_checks(self):
+        """
+        Members are checked by type, name and size, and removed if any fails.
+        """
+        archive = base64.b64encode(make_zip([
+            ('a.pdf', self.PDF), ('b.txt', b'text')])).decode()
+        cases = [
+            ({'member_types': ['pdf']}, "The type of b.txt isn't allowed."),
+            ({'max_members': 1}, 'The archive may not have more than 1 files.'),
+            ({'max_member_size': 4}, 'a.pdf may not be larger than 4 bytes.'),
+            ({'max_total_size': 16}, (
+                'The files in the archive may not be larger than 16 bytes in total.')),
+        ]
+        for kwargs, message in cases:
+            field = fields.Base64ArchiveField(storage=self.storage, **kwargs)
+            with self.assertRaises(ValidationError) as exc_info:
+                field.to_internal_value(archive)
+            self.assertEqual(exc_info.exception.messages, [message])
+            self.assertEqual(self.stored(), [])
+
+        field = fields.Base64ArchiveField(storage=self.storage)
+        for name in ('../evil.txt', 'a/../../evil.txt', '/'):
+            with self.assertRaises(ValidationError) as exc_info:
+                field.to_internal_value(make_tar([('a.pdf', self.PDF), (name, b'evil')]))
+            self.assertEqual(
+                exc_info.exception.messages, ["{0} isn't a valid file name.".format(name)])
+        self.assertEqual(self.stored(), [])
+
+        # Limits are on by default.
+        with patch.object(fields.Base64ArchiveField, 'max_members', 1):
+            with self.assertRaises(ValidationError):
+                fields.Base64ArchiveField(storage=self.storage).to_internal_value(archive)
+            field = fields.Base64ArchiveField(storage=self.storage, max_members=None)
+            self.assertEqual(len(field.to_internal_value(archive)), 2)
+        field = fields.Base64ArchiveField()
+        self.assertEqual(
+            (field.max_members, field.max_member_size, field.max_total_size),
+            (1000, 10 * 1024 * 1024, 100 * 1024 * 1024))
+
+    def test_lying_member_size(self):
+        """
+        Members are cut off at the size limit, whatever size they declare.
+        """
+        field = fields.Base64ArchiveField(storage=self.storage, max_member_size=10)
+        with patch.object(field, 'check_member'):
+            with self.assertRaises(ValidationError) as exc_info:
+                field.to_internal_value(make_zip([('a.txt', b'0' * 100000)]))
+        self.assertEqual(
+            exc_info.exception.messages, ['a.txt may not be larger than 10 bytes.'])
+        self.assertEqual(self.stored(), [])
+
+    def test_invalid(self):
+        """
+        Other types and broken archives are rejected.
+        """
+        field = fields.Base64ArchiveField(storage=self.storage)
+        with self.assertRaises(ValidationError) as exc_info:
+            field.to_internal_value(base64.b64encode(self.PDF).decode())
+        self.assertEqual(
+            exc_info.exception.messages, ["The type of the archive couldn't be determined."])
+
+        archive = make_zip([('a.pdf', self.PDF), ('b.pdf', self.PDF * 100)])
+        with self.assertRaises(ValidationError) as exc_info:
+            field.to_internal_value(archive[:-100])
+        self.assertEqual(exc_info.exception.messages, ['Please upload a valid archive.'])
+        with self.assertRaises(ValidationError):
+            field.to_internal_value(make_tar([('a.pdf', self.PDF)])[:-200])
+        self.assertEqual(self.stored(), [])
+
+        with self.assertRaises(AssertionError):
+            fields.Base64ArchiveField(content_addressed=True)
+
+
+class ImageListSerializer(serializers.Serializer):
+    images = fields.ConcurrentListField(child=Base64ImageField())
+
+
+@unittest.skipIf(compat.futures is None, 'concurrent.futures is not installed')
+class ConcurrentListFieldTests(TestCase):
+
+    def setUp(self):
+        self.executor = compat.futures.ThreadPoolExecutor(2)
+        self.addCleanup(self.executor.shutdown)
+        self.images = [make_base64_image(size=(index + 1, 1)) for index in range(4)]
+
+    def test_sequential(self):
+        """
+        Without an executor items are validated in turn.
+        """
+        serializer = ImageListSerializer(data={'images': self.images})
+        self.assertTrue(serializer.is_valid())
+        self.assertEqual(len(serializer.validated_data['images']), 4)
+
+    def test_threads(self):
+        """
+        Items are validated in the executor and errors are kept by index.
+        """
+        with override_settings(DRF_EXTRA_FIELDS_EXECUTOR=self.executor):
+            serializer = ImageListSerializer(data={'images': self.images})
+            self.assertTrue(serializer.is_valid())
+            self.assertEqual(
+                [image.image.size[0] for image in serializer.validated_data['images']],
+                [1, 2, 3, 4])
+
+            serializer = ImageListSerializer(
+                data={'images': self.images[:1] + ['abc', 123]})
+            self.assertFalse(serializer.is_valid())
+            self.assertEqual(serializer.errors, {'images': {
+                1: ['Please upload a valid image.'],
+                2: ['This is not an base64 string']}})
+
+            data = QueryDict('', mutable=True)
+            data.setlist('images', self.images[:2])
+            serializer = ImageListSerializer(data=data)
+            self.assertTrue(serializer.is_valid())
+            self.assertEqual(len(serializer.validated_data['images']), 2)
+
+            serializer = ImageListSerializer(data={'images': 'abc'})
+            self.assertFalse(serializer.is_valid())
+            serializer = ImageListSerializer(data={'images': {}})
+            self.assertFalse(serializer.is_valid())
+
+        field = fields.ConcurrentListField(
+            child=serializers.IntegerField(), executor=self.executor, allow_empty=False)
+        self.assertEqual(field.to_internal_value(['1', 2]), [1, 2])
+        with self.assertRaises(serializers.ValidationError):
+            field.to_internal_value([])
+
+    def test_declared_executor(self):
+        """
+        Executors given to declared fields are shared, not deep copied.
+        """
+        executor = compat.futures.ProcessPoolExecutor(1)
+        self.addCleanup(executor.shutdown)
+        for pool in (self.executor, executor):
+            class Serializer(serializers.Serializer):
+                images = fields.ConcurrentListField(child=Base64ImageField(), executor=pool)
+
+            serializer = Serializer(data={'images': self.images[:2]})
+            self.assertIs(serializer.fields['images'].executor, pool)
+            self.assertIs(copy.deepcopy(serializer.fields['images']).executor, pool)
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+
+    def test_dotted_path(self):
+        """
+        The executor setting may be the dotted path to one.
+        """
+        with patch.object(compat, 'test_executor', self.executor, create=True):
+            with override_settings(
+                    DRF_EXTRA_FIELDS_EXECUTOR='drf_extra_fields.compat.test_executor'):
+                self.assertIs(fields.ConcurrentListField().get_executor(), self.executor)
+
+    def test_decoded_size(self):
+        """
+        The decoded size of base64 and binary values is known up front.
+        """
+        field = Base64ImageField()
+        self.assertEqual(field.get_decoded_size('data:image/gif;base64,QUJD'), 3)
+        self.assertEqual(field.get_decoded_size(bytearray(b'abc')), 3)
+        self.assertIsNone(field.get_decoded_size(123))
+
+    @unittest.skipIf(six.PY2, 'memoryview.cast is not available')
+    def test_decoded_size_multidimensional(self):
+        field = Base64ImageField()
+        self.assertEqual(field.get_decoded_size(memoryview(b'abcd').cast('B', (2, 2))), 4)
+
+    def test_budget(self):
+        """
+        Concurrently validated items still share the request budget.
+        """
+        serializer = ImageListSerializer(
+            data={'images': self.images},
+            context={'max_total_decoded_size': sum(
+                fields.b64decoded_size(image) for image in self.images[:3])})
+        serializer.fields['images'].executor = self.executor
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(len(serializer.errors['images']), 1)
+
+    def test_processes(self):
+        """
+        Base64 fields are rebuilt and validated in worker processes.
+        """
+        executor = compat.futures.ProcessPoolExecutor(2)
+        self.addCleanup(executor.shutdown)
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        storage = FileSystemStorage(location=location)
+
+        budget = fields.b64decoded_size(self.images[0]) + 2
+
+        def bind(field):
+            field.bind('images', ImageListSerializer(
+                context={'max_total_decoded_size': budget}))
+            return field
+
+        field = bind(fields.ConcurrentListField(
+            child=Base64ImageField(representation_cache=LRUCache()), executor=executor))
+        values = field.to_internal_value(self.images[:1])
+        self.assertEqual(values[0].read(), base64.b64decode(self.images[0]))
+        self.assertEqual(values[0].content_type, 'image/png')
+
+        field = bind(fields.ConcurrentListField(
+            child=Base64ImageField(), executor=executor))
+        with self.assertRaises(serializers.ValidationError) as exc_info:
+            field.to_internal_value(self.images[:2] + ['abc'])
+        self.assertEqual(exc_info.exception.detail, {
+            1: ['The files in this request may not be larger than {0} bytes in total.'.format(
+                budget)],
+            2: ['Please upload a valid image.']})
+
+        field = fields.ConcurrentListField(
+            child=Base64ImageField(stream_to_storage=True, storage=storage),
+            executor=executor)
+        values = field.to_internal_value(self.images[:2] + [''])
+        self.assertIsInstance(values[0], fields.CommittedImageFile)
+        self.assertEqual(storage.open(values[1].name).read(), base64.b64decode(self.images[1]))
+        self.assertIsNone(values[2])
+
+        errors, name, content, content_type = fields.validate_base64_file(
+            Base64ImageField, (), {}, self.images[0])
+        self.assertEqual(content, base64.b64decode(self.images[0]))
+        self.assertEqual(
+            fields.validate_base64_file(Base64ImageField, (), {}, 'abc')[0],
+            ['Please upload a valid image.'])
+        self.assertEqual(
+            fields.validate_base64_file(Base64ImageField, (), {}, 123)[0],
+            ['This is not an base64 string'])
+        self.assertEqual(
+            fields.validate_base64_file(Base64ImageField, (), {'allow_null': True}, None),
+            (None, None, None, None))
+
+        # Output and post-processing arguments stay in this process.
+        store = LRUCache()
+        field = fields.ConcurrentListField(
+            child=Base64ImageField(
+                metadata_store=store, rendition_queue=WorkerQueue(),
+                renditions=[Rendition('thumb', (4, 4))]),
+            executor=executor)
+        values = field.to_internal_value(self.images[:1] + [memoryview(
+            base64.b64decode(self.images[1]))])
+        self.assertEqual(values[0].metadata['width'], 1)
+        self.assertEqual(store.get(field.child.get_metadata_key(values[1].name))['width'], 2)
+
+        # Children which can't be pickled are validated in turn.
+        class LocalImageField(Base64ImageField):
+            pass
+
+        field = fields.ConcurrentListField(child=LocalImageField(), executor=executor)
+        with patch.object(executor, 'submit') as submit:
+            self.assertEqual(len(field.to_internal_value(self.images[:2])), 2)
+        self.assertFalse(submit.called)
+
+        # Other children are validated in this process.
+        field = fields.ConcurrentListField(
+            child=serializers.IntegerField(), executor=executor)
+        self.assertEqual(field.to_internal_value(['1', 2]), [1, 2])
+
+
 class SavePoint(object):
     def __init__(self, point=None, created=None):
         self.point = point
@@ -303,6 +1444,83 @@ class PointSerializerTest(TestCase):
         serializer = PointSerializer(data={'created': now, 'point': point})
         self.assertFalse(serializer.is_valid())
 
+    def test_strings(self):
+        """
+        Points may be given as JSON, "lat,lng", WKT and EWKT strings.
+        """
+        field = PointField()
+        cases = [
+            ('{"latitude": 49.5, "longitude": 24.25}', None),
+            ("{'latitude': 49.5, 'longitude': 24.25}", None),
+            (' 49.5, 24.25 ', None),
+            ('POINT(24.25 49.5)', None),
+            ('point (24.25  49.5)', None),
+            ('SRID=4326;POINT(24.25 49.5)', 4326),
+            ('srid=3857; POINT (24.25 49.5)', 3857),
+        ]
+        for value, srid in cases:
+            point = field.to_internal_value(value)
+            self.assertEqual((point.x, point.y, point.srid), (24.25, 49.5, srid))
+
+        point = PointField(srid=4326).to_internal_value({'latitude': '49.5', 'longitude': 24})
+        self.assertEqual((point.x, point.y, point.srid), (24.0, 49.5, 4326))
+        point = PointField(srid=4326).to_internal_value('SRID=3857;POINT(1 2)')
+        self.assertEqual(point.srid, 3857)
+
+    def test_invalid_strings(self):
+        """
+        Anything else isn't a location.
+        """
+        field = PointField()
+        for value in ('{"latitude": 1', '1', 'a,b', 'nan,1', '1,inf',
+                      'POINT(1)', 'POINT 1 2', 'POINT(1 2 3)', 'SRID=x;POINT(1 2)',
+                      'SRID=4326;1,2', {'latitude': True, 'longitude': 1},
+                      {'latitude': 1}, 5):
+            with self.assertRaises(serializers.ValidationError):
+                field.to_internal_value(value)
+
+    def test_output_formats(self):
+        """
+        Points are output as string or float dicts, arrays or GeoJSON.
+        """
+        from django.contrib.gis.geos import Point
+
+        point = Point(24.452545489, 49.8782482189424)
+        cases = [
+            ({}, {'latitude': '49.8782482189424', 'longitude': '24.452545489'}),
+            ({'precision': 3}, {'latitude': '49.878', 'longitude': '24.453'}),
+            ({'point_format': 'float'}, {
+                'latitude': 49.8782482189424, 'longitude': 24.452545489}),
+            ({'point_format': 'array', 'precision': 2}, [24.45, 49.88]),
+            ({'point_format': 'geojson', 'precision': 5}, {
+                'type': 'Point', 'coordinates': [24.45255, 49.87825]}),
+        ]
+        for kwargs, representation in cases:
+            field = PointField(**kwargs)
+            self.assertEqual(field.to_representation(point), representation)
+            parsed = field.to_internal_value(representation)
+            self.assertAlmostEqual(parsed.x, point.x, places=kwargs.get('precision', 9))
+            self.assertAlmostEqual(parsed.y, point.y, places=kwargs.get('precision', 9))
+        self.assertIsNone(PointField().to_representation(None))
+        with self.assertRaises(AssertionError):
+            PointField(point_format='wkt')
+
+    def test_array_and_geojson(self):
+        """
+        Arrays and GeoJSON are [longitude, latitude], also in strings.
+        """
+        field = PointField(required=True)
+        for value in ([24.25, 49.5], (24.25, '49.5'), '[24.25, 49.5]',
+                      {'type': 'Point', 'coordinates': [24.25, 49.5]},
+                      '{"type": "Point", "coordinates": [24.25, 49.5]}'):
+            point = field.to_internal_value(value)
+            self.assertEqual((point.x, point.y), (24.25, 49.5))
+        for value in ([1], [1, 2, 3], '[1, 2', [],
+                      {'type': 'LineString', 'coordinates': [1, 2]},
+                      {'type': 'Point', 'coordinates': 1}):
+            with self.assertRaises(serializers.ValidationError):
+                field.to_internal_value(value)
+
 
 class FieldValues:
     """
@@ -551,3 +1769,254 @@ class TestDateRangeField(TestCase, FieldValues):
             "when applied to a `child=` field. "
             "Remove `source=` from the field declaration."
         )
+
+
+@unittest.skipIf(
+    django.VERSION < (1, 8) or compat.postgres_fields is None,
+    reason='RangeField is only available for django1.8+ and with psycopg2.')
+class TestRangeListField(TestCase):
+
+    def test_integer_ranges(self):
+        """
+        Ranges are validated like the child range field does.
+        """
+        field = RangeListField(child=IntegerRangeField())
+        data = [{'lower': 1, 'upper': 2}, {'lower': '3', 'bounds': '[]'},
+                {'upper': 4}, {'empty': True}, {}]
+        expected = [compat.NumericRange(1, 2), compat.NumericRange(3, None, '[]'),
+                    compat.NumericRange(None, 4), compat.NumericRange(empty=True),
+                    compat.NumericRange()]
+        for use_numpy in (True, False):
+            field = RangeListField(child=IntegerRangeField(), use_numpy=use_numpy)
+            self.assertEqual(field.to_internal_value(data), expected)
+            self.assertEqual(field.to_internal_value(
+                [{'lower': i, 'upper': i + 1} for i in range(100)]),
+                [compat.NumericRange(i, i + 1) for i in range(100)])
+            self.assertEqual(
+                [field.child.to_internal_value(item) for item in data], expected)
+        self.assertEqual(field.to_internal_value([]), [])
+        field = RangeListField(child=IntegerRangeField())
+        self.assertEqual(field.to_internal_value([{'lower': 2 ** 70}]), [
+            compat.NumericRange(2 ** 70)])
+        self.assertEqual(field.to_representation(expected[:1]), [
+            {'lower': 1, 'upper': 2, 'bounds': '[)'}])
+
+    def test_float_ranges(self):
+        """
+        Float bounds may be given as integers.
+        """
+        for use_numpy in (True, False):
+            field = RangeListField(child=FloatRangeField(), use_numpy=use_numpy)
+            ranges = field.to_internal_value([
+                {'lower': 1, 'upper': 2.5}, {'lower': 2, 'upper': 3}])
+            self.assertEqual(ranges, [
+                compat.NumericRange(1.0, 2.5), compat.NumericRange(2.0, 3.0)])
+            self.assertIsInstance(ranges[1].lower, float)
+
+    def test_date_ranges(self):
+        """
+        Equal bounds are validated once.
+        """
+        field = RangeListField(child=DateRangeField())
+        data = [{'lower': '2001-01-01', 'upper': '2001-01-02'}] * 50
+        with patch.object(
+                field.child.child, 'run_validation',
+                wraps=field.child.child.run_validation) as run_validation:
+            ranges = field.to_internal_value(data)
+        self.assertEqual(run_validation.call_count, 2)
+        self.assertEqual(ranges, [compat.DateRange(
+            datetime.date(2001, 1, 1), datetime.date(2001, 1, 2))] * 50)
+
+    def test_errors(self):
+        """
+        Errors are collected by index.
+        """
+        for use_numpy in (True, False):
+            field = RangeListField(
+                child=IntegerRangeField(child=serializers.IntegerField(min_value=0)),
+                use_numpy=use_numpy)
+            with self.assertRaises(serializers.ValidationError) as exc_info:
+                field.to_internal_value([
+                    {'lower': 1}, {'lower': -1}, 'abc', {'lower': 1, 'foo': 1},
+                    {'upper': 1.5}, {'lower': [1]}, {'lower': 0, 'upper': 'a'}])
+            self.assertEqual(exc_info.exception.detail, {
+                1: ['Ensure this value is greater than or equal to 0.'],
+                2: ['Expected a dictionary of items but got type "str".'],
+                3: ['Extra content not allowed "foo".'],
+                4: ['A valid integer is required.'],
+                5: ['A valid integer is required.'],
+                6: ['A valid integer is required.'],
+            })
+
+            field = RangeListField(child=FloatRangeField(
+                child=serializers.FloatField(min_value=0, max_value=10)), use_numpy=use_numpy)
+            for data in ([{'lower': -1}], [{'upper': 11}]):
+                with self.assertRaises(serializers.ValidationError) as exc_info:
+                    field.to_internal_value(data)
+                self.assertEqual(list(exc_info.exception.detail), [0])
+
+        field = RangeListField(child=IntegerRangeField(), allow_empty=False)
+        with self.assertRaises(serializers.ValidationError):
+            field.to_internal_value([])
+        with self.assertRaises(serializers.ValidationError):
+            field.to_internal_value({'lower': 1})
+        with self.assertRaises(AssertionError):
+            RangeListField(child=serializers.IntegerField())
+
+    def test_child_validation(self):
+        """
+        The validators and null handling of the child range field apply.
+        """
+        def bounded(value):
+            if value.lower is None or value.upper is None:
+                raise serializers.ValidationError('Bounded only.')
+        field = RangeListField(child=IntegerRangeField(validators=[bounded]))
+        with self.assertRaises(serializers.ValidationError) as exc_info:
+            field.to_internal_value([{'lower': 1}, {'lower': 1, 'upper': 2}, None])
+        self.assertEqual(exc_info.exception.detail, {
+            0: ['Bounded only.'], 2: ['This field may not be null.']})
+
+        field = RangeListField(child=IntegerRangeField(allow_null=True))
+        self.assertEqual(field.to_internal_value([None, {'lower': 1}]), [
+            None, compat.NumericRange(1)])
+        field = IntegerMultiRangeField(child=IntegerRangeField(allow_null=True))
+        self.assertEqual(field.to_internal_value([None, {'lower': 1}]), [
+            compat.NumericRange(1)])
+
+    def test_custom_validators(self):
+        """
+        Bounds with validators other than limits aren't vectorized.
+        """
+        def odd(value):
+            if not value % 2:
+                raise serializers.ValidationError('Odd only.')
+        field = RangeListField(child=IntegerRangeField(
+            child=serializers.IntegerField(validators=[odd])))
+        with self.assertRaises(serializers.ValidationError) as exc_info:
+            field.to_internal_value([{'lower': 1}, {'lower': 1, 'upper': 2}])
+        self.assertEqual(exc_info.exception.detail, {1: ['Odd only.']})
+
+
+@unittest.skipIf(
+    django.VERSION < (1, 8) or compat.postgres_fields is None,
+    reason='RangeField is only available for django1.8+ and with psycopg2.')
+class TestRangeFormats(TestCase):
+
+    @override_settings(USE_TZ=True)
+    def test_literal(self):
+        """
+        Ranges may be given and represented as PostgreSQL literals.
+        """
+        field = IntegerRangeField(range_format='literal')
+        cases = [
+            ('[1,10)', compat.NumericRange(1, 10)),
+            ('(,5]', compat.NumericRange(None, 5, '(]')),
+            ('empty', compat.NumericRange(empty=True)),
+        ]
+        for literal, value in cases:
+            self.assertEqual(field.to_internal_value(literal), value)
+            self.assertEqual(field.to_representation(value), literal)
+        self.assertEqual(
+            field.to_internal_value({'lower': 1, 'upper': 10}), compat.NumericRange(1, 10))
+
+        field = DateTimeRangeField(range_format='literal')
+        value = compat.DateTimeTZRange(
+            datetime.datetime(2001, 1, 1, 13, tzinfo=pytz.utc), None)
+        self.assertEqual(field.to_representation(value), '[2001-01-01T13:00:00Z,)')
+        self.assertEqual(
+            field.to_internal_value('["2001-01-01 13:00:00Z",)'),
+            field.to_internal_value({'lower': '2001-01-01T13:00:00Z'}))
+        self.assertEqual(
+            DateRangeField(range_format='literal').to_internal_value('[2001-01-01,2001-01-02)'),
+            compat.DateRange(datetime.date(2001, 1, 1), datetime.date(2001, 1, 2)))
+
+        for data in ('1,10', 1, '[a,b)'):
+            with self.assertRaises(serializers.ValidationError):
+                field.to_internal_value(data)
+        with self.assertRaises(serializers.ValidationError) as exc_info:
+            field.to_internal_value('[1,10')
+        self.assertEqual(exc_info.exception.detail, [
+            'Expected a range literal like "[1,10)" but got "[1,10".'])
+
+    def test_array(self):
+        """
+        Ranges may be given and represented as arrays.
+        """
+        field = FloatRangeField(range_format='array')
+        cases = [
+            ([1.5, 2.5, '[)'], compat.NumericRange(1.5, 2.5)),
+            ([None, 2.5, '(]'], compat.NumericRange(None, 2.5, '(]')),
+            ([], compat.NumericRange(empty=True)),
+        ]
+        for array, value in cases:
+            self.assertEqual(field.to_internal_value(array), value)
+            self.assertEqual(field.to_representation(value), array)
+        self.assertEqual(field.to_internal_value((1, None)), compat.NumericRange(1.0, None))
+
+        for data in ([1], [1, 2, '[)', 4], 'abc'):
+            with self.assertRaises(serializers.ValidationError) as exc_info:
+                field.to_internal_value(data)
+            self.assertEqual(exc_info.exception.detail, [
+                'Expected a list of the lower and upper bound and optionally the bounds.'])
+        for data in ([1, 2, '{}'], {'lower': 1, 'bounds': '<>'}):
+            with self.assertRaises(serializers.ValidationError):
+                field.to_internal_value(data)
+        with self.assertRaises(serializers.ValidationError) as exc_info:
+            IntegerRangeField().to_internal_value({'bounds': '[['})
+        self.assertEqual(exc_info.exception.detail, ['"[[" are not valid bounds.'])
+
+    def test_list(self):
+        """
+        Range lists take the format of their child.
+        """
+        field = RangeListField(child=IntegerRangeField(range_format='literal'))
+        self.assertEqual(field.to_internal_value(['[1,2)', 'empty']), [
+            compat.NumericRange(1, 2), compat.NumericRange(empty=True)])
+        self.assertEqual(field.to_representation([compat.NumericRange(1, 2)]), ['[1,2)'])
+        with self.assertRaises(AssertionError):
+            IntegerRangeField(range_format='string')
+
+
+@unittest.skipIf(
+    django.VERSION < (1, 8) or compat.postgres_fields is None,
+    reason='RangeField is only available for django1.8+ and with psycopg2.')
+class TestMultiRangeFields(TestCase):
+
+    def test_integer(self):
+        """
+        Ranges are sorted, made [) and merged.
+        """
+        field = IntegerMultiRangeField()
+        self.assertEqual(field.to_internal_value([
+            {'lower': 5, 'upper': 7, 'bounds': '[]'}, {'lower': 1, 'upper': 3},
+            {'lower': 2, 'upper': 4, 'bounds': '(]'}, {'empty': True},
+            {'lower': 10}]), [
+            compat.NumericRange(1, 8), compat.NumericRange(10, None)])
+        self.assertEqual(field.to_representation([
+            compat.NumericRange(3, 4), compat.NumericRange(1, 3)]), [
+            {'lower': 1, 'upper': 4, 'bounds': '[)'}])
+
+        with self.assertRaises(serializers.ValidationError) as exc_info:
+            field.to_internal_value([{'lower': 1}, {'lower': 3, 'upper': 2}])
+        self.assertEqual(exc_info.exception.detail, {
+            1: ['The lower bound may not be above the upper bound.']})
+
+    def test_dates(self):
+        """
+        Consecutive days are merged, other times only when they meet.
+        """
+        field = DateMultiRangeField(child=DateRangeField(range_format='literal'))
+        self.assertEqual(
+            field.to_internal_value(['[2001-01-05,2001-01-06]', '[2001-01-01,2001-01-04]']),
+            [compat.DateRange(datetime.date(2001, 1, 1), datetime.date(2001, 1, 7))])
+        self.assertEqual(field.to_representation([
+            compat.DateRange(datetime.date(2001, 1, 1), datetime.date(2001, 1, 3))]),
+            ['[2001-01-01,2001-01-03)'])
+
+        field = DateTimeMultiRangeField(child=DateTimeRangeField(range_format='literal'))
+        self.assertEqual(field.to_representation(field.to_internal_value([
+            '[2001-01-01T10:00:00,2001-01-01T12:00:00)',
+            '(2001-01-01T12:00:00,2001-01-01T13:00:00]',
+            '[2001-01-01T08:00:00,2001-01-01T11:00:00)'])), [
+            '[2001-01-01T08:00:00,2001-01-01T12:00:00)',
+            '(2001-01-01T12:00:00,2001-01-01T13:00:00]'])
@@ -0,0 +1,91 @@
+import datetime
+import unittest
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+
+from rest_framework import exceptions
+from rest_framework import serializers
+from rest_framework import test
+from rest_framework.request import Request
+
+from drf_extra_fields import compat
+from drf_extra_fields import fields
+from drf_extra_fields.filters import RangeFilterBackend
+from drf_extra_fields.runtests import models
+
+
+class BookingView(object):
+    range_filter_fields = ('period', 'days', 'seats')
+
+
+def get_lookups(queryset):
+    return sorted(
+        (lookup.lhs.target.name, lookup.lookup_name, lookup.rhs)
+        for lookup in queryset.query.where.children)
+
+
+@unittest.skipIf(compat.postgres_fields is None, 'psycopg2 is not installed')
+class RangeFilterBackendTests(TestCase):
+
+    def filter(self, params, view=None):
+        request = Request(test.APIRequestFactory().get('/', params))
+        return RangeFilterBackend().filter_queryset(
+            request, models.Booking.objects.all(), view or BookingView())
+
+    def test_filter(self):
+        """
+        Query parameters become range lookups of one filter.
+        """
+        queryset = self.filter({
+            'days__overlap': '[2001-01-01,2001-02-01)',
+            'seats__contains': '4',
+            'seats__contained_by': '[1,10]',
+            'period__fully_lt': '[2001-01-01T10:00:00,)',
+            'name': 'ignored',
+        })
+        self.assertEqual(get_lookups(queryset), [
+            ('days', 'overlap', compat.DateRange(
+                datetime.date(2001, 1, 1), datetime.date(2001, 2, 1))),
+            ('period', 'fully_lt', compat.DateTimeTZRange(
+                datetime.datetime(2001, 1, 1, 10), None)),
+            ('seats', 'contained_by', compat.NumericRange(1, 10, '[]')),
+            ('seats', 'contains', 4),
+        ])
+        self.assertEqual(get_lookups(self.filter({'seats__contains': ' (1,3)'})), [
+            ('seats', 'contains', compat.NumericRange(1, 3, '()'))])
+        self.assertEqual(get_lookups(self.filter({})), [])
+        self.assertEqual(get_lookups(self.filter({'seats__overlap': 'empty'})), [
+            ('seats', 'overlap', compat.NumericRange(empty=True))])
+
+    def test_invalid(self):
+        """
+        Invalid values are errors by parameter.
+        """
+        with self.assertRaises(exceptions.ValidationError) as exc_info:
+            self.filter({'seats__overlap': '[1,a)', 'days__contains': 'x'})
+        self.assertEqual(exc_info.exception.get_codes(), {
+            'seats__overlap': ['invalid'],
+            'days__contains': ['invalid'],
+        })
+
+    def test_fields(self):
+        """
+        Range fields may be given, in any format.
+        """
+        class View(object):
+            range_filter_fields = {
+                'seats': fields.IntegerRangeField(
+                    child=serializers.IntegerField(max_value=10)),
+                'days': fields.DateRangeField,
+            }
+        self.assertEqual(get_lookups(self.filter(
+            {'seats__overlap': '[1,2)', 'days__contains': '2001-01-01'}, View())), [
+            ('days', 'contains', datetime.date(2001, 1, 1)),
+            ('seats', 'overlap', compat.NumericRange(1, 2))])
+        with self.assertRaises(exceptions.ValidationError):
+            self.filter({'seats__overlap': '[1,20)'}, View())
+
+        View.range_filter_fields = ('name',)
+        with self.assertRaises(ImproperlyConfigured):
+            self.filter({}, View())
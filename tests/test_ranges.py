@@ -0,0 +1,108 @@
+import datetime
+import unittest
+
+from django.test import TestCase
+
+from drf_extra_fields import compat
+from drf_extra_fields import ranges
+
+
+class RangeLiteralTests(TestCase):
+
+    def test_parse(self):
+        """
+        Literals are split into their bounds.
+        """
+        cases = [
+            ('[1,10)', ('1', '10', '[)', False)),
+            (' (1.5, 2] ', ('1.5', '2', '(]', False)),
+            ('[,10]', (None, '10', '[]', False)),
+            ('(2001-01-01,)', ('2001-01-01', None, '()', False)),
+            ('(,)', (None, None, '()', False)),
+            ('Empty', (None, None, None, True)),
+            ('["2001-01-01 00:00:00+00","2001-02-01 00:00:00+00")',
+             ('2001-01-01 00:00:00+00', '2001-02-01 00:00:00+00', '[)', False)),
+            (r'["a\"b","c""d")', ('a"b', 'c"d', '[)', False)),
+            ('["",a)', ('', 'a', '[)', False)),
+            ('[a,"b,c"]', ('a', 'b,c', '[]', False)),
+        ]
+        for literal, expected in cases:
+            self.assertEqual(ranges.parse_range_literal(literal), expected)
+
+    def test_parse_invalid(self):
+        """
+        Anything else raises ValueError.
+        """
+        for literal in ('', '[1]', '1,2', '[1,2', '{1,2}', '[1,2,3)', '["1",2,3)',
+                        '["1"2)', '["1,2)', '[1,a"b)', '[1,"2"3)', '[1\\,2)'):
+            with self.assertRaises(ValueError):
+                ranges.parse_range_literal(literal)
+
+    def test_format(self):
+        """
+        Bounds are quoted only when needed, and round trip.
+        """
+        cases = [
+            ((1, 10, '[)'), '[1,10)'),
+            ((None, 2.5, '(]'), '(,2.5]'),
+            (('2001-01-01T13:00:00Z', None, '[)'), '[2001-01-01T13:00:00Z,)'),
+            (('a b', 'c"d\\', '[]'), r'["a b","c\"d\\"]'),
+            (('', 'a,b', '()'), '("","a,b")'),
+        ]
+        for (lower, upper, bounds), literal in cases:
+            self.assertEqual(ranges.format_range_literal(lower, upper, bounds), literal)
+            self.assertEqual(ranges.parse_range_literal(literal)[:3], tuple(
+                None if bound is None else str(bound) for bound in (lower, upper)) + (bounds,))
+
+
+@unittest.skipIf(compat.NumericRange is None, 'psycopg2 is not installed')
+class MergeRangesTests(TestCase):
+
+    def merge(self, values, step=None):
+        return ranges.merge_ranges(
+            [compat.NumericRange(*value) for value in values], step)
+
+    def test_merge(self):
+        """
+        Overlapping and adjacent ranges are coalesced, in order.
+        """
+        self.assertEqual(self.merge([
+            (5, 7, '[)'), (1, 3, '[)'), (2, 4, '[)'), (4, 5, '[)'), (10, 12, '[)')]), [
+            (1, 7, '[)'), (10, 12, '[)')])
+        self.assertEqual(self.merge([(1, 10, '[)'), (2, 3, '[)')]), [(1, 10, '[)')])
+        self.assertEqual(self.merge([]), [])
+
+    def test_bounds(self):
+        """
+        Ranges only touching at an excluded value stay apart.
+        """
+        self.assertEqual(self.merge([(0.5, 1.5, '()'), (1.5, 2.5, '()')]), [
+            (0.5, 1.5, '()'), (1.5, 2.5, '()')])
+        self.assertEqual(self.merge([(0.5, 1.5, '(]'), (1.5, 2.5, '()')]), [
+            (0.5, 2.5, '()')])
+        self.assertEqual(self.merge([(0.5, 1.5, '()'), (1.5, 2.5, '[)')]), [
+            (0.5, 2.5, '()')])
+        self.assertEqual(self.merge([(1, 2, '[)'), (1, 2, '[]'), (1, 2, '()')]), [
+            (1, 2, '[]')])
+        self.assertEqual(self.merge([(1, 1, '[)'), (1, 1, '[]')]), [(1, 1, '[]')])
+
+    def test_unbounded(self):
+        """
+        Unbounded ends swallow what they reach.
+        """
+        self.assertEqual(self.merge([(5, None, '[)'), (None, 1, '[)'), (7, 9, '[)')]), [
+            (None, 1, '()'), (5, None, '[)')])
+        self.assertEqual(self.merge([(None, 3, '[)'), (None, 1, '[)'), (2, None, '[)')]), [
+            (None, None, '()')])
+
+    def test_discrete(self):
+        """
+        Discrete ranges are made [) and merge when consecutive.
+        """
+        self.assertEqual(self.merge([(1, 3, '[]'), (3, 6, '()'), (8, 8, '()')], 1), [
+            (1, 6, '[)')])
+        self.assertEqual(self.merge([(1, 3, '[]'), (4, 6, '[)')], 1), [(1, 6, '[)')])
+        self.assertEqual(ranges.merge_ranges([compat.DateRange(
+            datetime.date(2001, 1, 1), datetime.date(2001, 1, 2), '[]'),
+            compat.DateRange(empty=True)], datetime.timedelta(days=1)), [
+            (datetime.date(2001, 1, 1), datetime.date(2001, 1, 3), '[)')])
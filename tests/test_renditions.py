@@ -0,0 +1,96 @@
+import io
+
+from django.test import TestCase
+
+from mock import patch
+
+from drf_extra_fields import renditions
+
+
+def make_image(size=(20, 10), mode='RGB', format='PNG', **options):
+    from PIL import Image
+
+    output = io.BytesIO()
+    Image.new(mode, size).save(output, format, **options)
+    return Image.open(io.BytesIO(output.getvalue()))
+
+
+def open_rendered(content):
+    from PIL import Image
+
+    return Image.open(io.BytesIO(content))
+
+
+class RenditionTests(TestCase):
+
+    def test_render(self):
+        """
+        Images are scaled down to fit, in the original format by default.
+        """
+        rendered = open_rendered(
+            renditions.Rendition('thumb', (10, 10)).render(make_image()))
+        self.assertEqual(rendered.format, 'PNG')
+        self.assertEqual(rendered.size, (10, 5))
+
+    def test_format(self):
+        """
+        Renditions may be re-encoded, JPEG ones progressively.
+        """
+        rendition = renditions.Rendition('thumb', (4, 4), format='jpeg', quality=50)
+        rendered = open_rendered(rendition.render(make_image(mode='RGBA')))
+        self.assertEqual(rendered.format, 'JPEG')
+        self.assertTrue(rendered.info.get('progressive'))
+        self.assertEqual(rendition.get_extension('png'), 'jpg')
+        self.assertEqual(renditions.Rendition('r', (1, 1), 'TIFF').get_extension('png'), 'tiff')
+        self.assertEqual(renditions.Rendition('r', (1, 1)).get_extension('png'), 'png')
+
+    def test_exif(self):
+        """
+        EXIF metadata is stripped unless asked to keep it.
+        """
+        from PIL import Image
+
+        exif = Image.Exif()
+        exif[0x010e] = 'description'
+        image = make_image(format='JPEG', exif=exif.tobytes())
+        self.assertIn('exif', image.info)
+
+        stripped = open_rendered(
+            renditions.Rendition('thumb', (10, 10)).render(image))
+        self.assertNotIn('exif', stripped.info)
+        kept = open_rendered(renditions.Rendition(
+            'thumb', (10, 10), strip_exif=False).render(make_image(
+                format='JPEG', exif=exif.tobytes())))
+        self.assertIn('exif', kept.info)
+
+
+class WorkerQueueTests(TestCase):
+
+    def test_run(self):
+        """
+        Functions run in order on one background thread.
+        """
+        queue = renditions.WorkerQueue()
+        results = []
+        queue.put(results.append, 1)
+        queue.put(results.append, 2)
+        queue.join()
+        self.assertEqual(results, [1, 2])
+        thread = queue.thread
+        queue.put(results.append, 3)
+        queue.join()
+        self.assertIs(queue.thread, thread)
+        self.assertEqual(results, [1, 2, 3])
+
+    def test_errors(self):
+        """
+        Errors are logged and don't stop the queue.
+        """
+        queue = renditions.WorkerQueue()
+        results = []
+        with patch.object(renditions.logger, 'exception') as exception:
+            queue.put(int, 'abc')
+            queue.put(results.append, 1)
+            queue.join()
+        self.assertTrue(exception.called)
+        self.assertEqual(results, [1])
@@ -0,0 +1,67 @@
+import io
+
+from django.test import TestCase
+
+from drf_extra_fields import signatures
+
+
+class TestSignatureRegistry(TestCase):
+    """
+    Test recognizing file types from their magic numbers.
+    """
+
+    def test_match(self):
+        """
+        Common image, document and archive formats are recognized.
+        """
+        registry = signatures.registry
+        cases = [
+            (b'\x89PNG\r\n\x1a\n\x00\x00', 'png', 'image/png'),
+            (b'\xff\xd8\xff\xe0\x00\x10JFIF', 'jpg', 'image/jpeg'),
+            (b'RIFF\x00\x00\x00\x00WEBPVP8 ', 'webp', 'image/webp'),
+            (b'\x00\x00\x00\x1cftypavif', 'avif', 'image/avif'),
+            (b'\x00\x00\x00\x18ftypheic', 'heic', 'image/heic'),
+            (b'%PDF-1.4\n', 'pdf', 'application/pdf'),
+            (b'PK\x03\x04\x14\x00', 'zip', 'application/zip'),
+            (b'a' * 257 + b'ustar\x0000', 'tar', 'application/x-tar'),
+        ]
+        for header, extension, mime_type in cases:
+            signature = registry.match(header)
+            self.assertEqual(signature.extension, extension)
+            self.assertEqual(signature.mime_type, mime_type)
+
+    def test_no_match(self):
+        """
+        Unknown, truncated or partially matching headers aren't recognized.
+        """
+        registry = signatures.registry
+        self.assertIsNone(registry.match(b'not a known format'))
+        self.assertIsNone(registry.match(b''))
+        self.assertIsNone(registry.match(b'\x89PN'))
+        self.assertIsNone(registry.match(b'RIFF\x00\x00\x00\x00WAVEfmt '))
+
+    def test_register(self):
+        """
+        The most specific of the registered signatures wins.
+        """
+        registry = signatures.SignatureRegistry()
+        registry.register(b'AB', 'ab', 'application/x-ab')
+        registry.register(b'ABCD', 'abcd', 'application/x-abcd')
+        registry.register(b'XY', 'xy', 'application/x-xy', offset=2)
+        self.assertEqual(registry.max_length, 4)
+        self.assertEqual(registry.match(b'ABC').extension, 'ab')
+        self.assertEqual(registry.match(b'ABCDE').extension, 'abcd')
+        self.assertEqual(registry.match(b'..XY').extension, 'xy')
+        self.assertEqual(registry.get_mime_type('abcd'), 'application/x-abcd')
+        self.assertIsNone(registry.get_mime_type('unknown'))
+
+    def test_detect_file(self):
+        """
+        Detecting from a file object doesn't move its position.
+        """
+        decoded_file = io.BytesIO(b'GIF89a\x01\x00')
+        decoded_file.seek(1)
+        self.assertIsNone(signatures.registry.detect(decoded_file))
+        decoded_file.seek(0)
+        self.assertEqual(signatures.registry.detect(decoded_file).extension, 'gif')
+        self.assertEqual(decoded_file.tell(), 0)
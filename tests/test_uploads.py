@@ -0,0 +1,288 @@
+import base64
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from django.core.exceptions import ValidationError
+from django.core.files.storage import FileSystemStorage
+from django.test import TestCase, override_settings
+
+from mock import patch
+
+from rest_framework import test
+
+from drf_extra_fields import uploads
+from drf_extra_fields.renditions import Rendition
+
+
+def make_image():
+    from PIL import Image
+
+    image_file = io.BytesIO()
+    Image.new('RGB', (10, 10)).save(image_file, 'PNG')
+    return image_file.getvalue()
+
+
+class PDFResumableFileField(uploads.ResumableBase64FileField):
+    ALLOWED_TYPES = ('pdf',)
+
+
+class ResumableUploadTests(TestCase):
+
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location)
+        self.store = uploads.LocalUploadStore(os.path.join(self.location, 'uploads'))
+        self.factory = test.APIRequestFactory()
+        self.view = uploads.ResumableUploadViewSet.as_view({
+            'post': 'create', 'get': 'retrieve', 'put': 'update',
+            'patch': 'partial_update', 'delete': 'destroy'},
+            upload_store=self.store, max_upload_size=100, max_chunk_size=10)
+
+    def request(self, method, data=None, pk=None):
+        request = getattr(self.factory, method)('/', data, format='json')
+        if pk is None:
+            return self.view(request)
+        return self.view(request, pk=pk)
+
+    def upload(self, content, chunk_size=10):
+        token = self.request('post', {'size': len(content)}).data['upload_token']
+        for offset in range(0, len(content), chunk_size):
+            chunk = base64.b64encode(content[offset:offset + chunk_size]).decode()
+            self.request('patch', {'offset': offset, 'chunk': chunk}, token)
+        return token
+
+    def test_upload(self):
+        """
+        Chunks are appended at the offset the upload ends at.
+        """
+        response = self.request('post', {'size': 15})
+        self.assertEqual(response.status_code, 201)
+        token = response.data['upload_token']
+        self.assertEqual(response.data, {
+            'upload_token': token, 'size': 15, 'offset': 0, 'complete': False})
+
+        response = self.request('put', {
+            'offset': 0, 'chunk': base64.b64encode(b'0123456789').decode()}, token)
+        self.assertEqual(response.data['offset'], 10)
+
+        # A retried chunk is refused with the offset to resume from.
+        response = self.request('put', {
+            'offset': 0, 'chunk': base64.b64encode(b'0123456789').decode()}, token)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['offset'], 10)
+        # A chunk going beyond the size isn't worth retrying.
+        response = self.request('put', {
+            'offset': 10, 'chunk': base64.b64encode(b'abcdef').decode()}, token)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data, {'chunk': ['The chunk goes beyond the size of the upload.']})
+        with self.assertRaises(uploads.ChunkTooLarge):
+            self.store.append(token, 10, b'abcdef')
+
+        self.store.append(token, 10, b'abcde')
+        response = self.request('get', pk=token)
+        self.assertEqual(response.data['offset'], 15)
+        self.assertTrue(response.data['complete'])
+        with self.store.open(token) as upload:
+            self.assertEqual(upload.read(), b'0123456789abcde')
+
+        response = self.request('delete', pk=token)
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.request('get', pk=token).status_code, 404)
+
+    def test_invalid(self):
+        """
+        Sizes, chunks and tokens are validated.
+        """
+        self.assertEqual(self.request('post', {'size': 0}).status_code, 400)
+        response = self.request('post', {'size': 101})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data, {'size': ['The file may not be larger than 100 bytes.']})
+
+        token = self.request('post', {'size': 50}).data['upload_token']
+        response = self.request('put', {'offset': 0, 'chunk': 'abc'}, token)
+        self.assertEqual(response.data, {'chunk': ['Please upload a valid chunk.']})
+        response = self.request('put', {'offset': 0, 'chunk': 123}, token)
+        self.assertEqual(response.status_code, 400)
+        response = self.request(
+            'put', {'offset': 0, 'chunk': base64.b64encode(b'0' * 11).decode()}, token)
+        self.assertEqual(
+            response.data, {'chunk': ['The file may not be larger than 10 bytes.']})
+
+        self.assertEqual(self.request('get', pk='0' * 32).status_code, 404)
+        with self.assertRaises(uploads.UploadError):
+            self.store.get_path('../' + token[3:])
+        with self.assertRaises(uploads.UploadError):
+            self.store.open(token)
+        os.remove(self.store.get_path(token))
+        with self.assertRaises(uploads.UploadError):
+            self.store.get_offset(token)
+        with self.assertRaises(uploads.UploadError):
+            self.store.append(token, 0, b'abc')
+
+    def test_default_max_upload_size(self):
+        """
+        Uploads are limited in size unless the view says otherwise.
+        """
+        view = uploads.ResumableUploadViewSet.as_view(
+            {'post': 'create'}, upload_store=self.store)
+        response = view(self.factory.post(
+            '/', {'size': uploads.DEFAULT_MAX_UPLOAD_SIZE + 1}, format='json'))
+        self.assertEqual(response.status_code, 400)
+
+    @unittest.skipIf(uploads.fcntl is None, 'fcntl is not available')
+    def test_append_lock(self):
+        """
+        The offset is checked and the chunk written under a file lock.
+        """
+        token = self.store.create(6)
+        self.store.append(token, 0, b'abc')
+
+        def flock(part, operation):
+            # Another process appended while this one waited for the lock.
+            with open(self.store.get_path(token), 'ab') as other:
+                other.write(b'def')
+
+        with patch.object(uploads.fcntl, 'flock', side_effect=flock) as flock_patch:
+            with self.assertRaises(uploads.OffsetMismatch) as exc_info:
+                self.store.append(token, 3, b'def')
+        self.assertEqual(flock_patch.call_args[0][1], uploads.fcntl.LOCK_EX)
+        self.assertEqual(exc_info.exception.offset, 6)
+
+    def test_binary_chunks(self):
+        """
+        Binary parsers can send chunks as they are.
+        """
+        token = self.store.create(3)
+        self.assertEqual(uploads.ChunkField().to_internal_value(bytearray(b'abc')), b'abc')
+        self.assertEqual(self.store.append(token, 0, b'abc'), 3)
+
+    def test_expire(self):
+        """
+        Uploads not written to for a while are removed.
+        """
+        token = self.store.create(10)
+        self.store.expire(60)
+        self.assertEqual(self.store.get_offset(token), 0)
+        self.store.expire(-1)
+        with self.assertRaises(uploads.UploadError):
+            self.store.get_size(token)
+        self.store.delete(token)
+
+    def test_expire_on_create(self):
+        """
+        Creating uploads expires stale ones, at most every `expire_interval`.
+        """
+        stale = self.store.create(10)
+        self.store.max_age = -1
+        self.store.expired_at = None
+        token = self.store.create(10)
+        with self.assertRaises(uploads.UploadError):
+            self.store.get_size(stale)
+
+        self.store.create(10)
+        self.assertEqual(self.store.get_size(token), 10)
+        self.store.expired_at -= self.store.expire_interval
+        self.store.create(10)
+        with self.assertRaises(uploads.UploadError):
+            self.store.get_size(token)
+
+        store = uploads.LocalUploadStore(self.store.directory, max_age=None)
+        with patch.object(store, 'expire') as expire:
+            store.create(10)
+        self.assertFalse(expire.called)
+
+    def test_default_store(self):
+        """
+        Uploads are kept in the directory from the settings by default.
+        """
+        directory = os.path.join(self.location, 'default')
+        with override_settings(DRF_EXTRA_FIELDS_UPLOAD_DIR=directory):
+            token = uploads.default_store.create(10)
+            self.assertTrue(os.path.exists(os.path.join(directory, token + '.part')))
+            self.assertEqual(
+                uploads.ResumableUploadViewSet().get_upload_store(), uploads.default_store)
+
+    def test_field(self):
+        """
+        Fields take the token of a completed upload instead of the file.
+        """
+        content = b'%PDF-1.4\n' + b'0' * 30 + b'\n%%EOF\n'
+        token = self.upload(content)
+        storage = FileSystemStorage(location=os.path.join(self.location, 'media'))
+        field = PDFResumableFileField(
+            upload_store=self.store, stream_to_storage=True, storage=storage)
+        stored = field.to_internal_value({'upload_token': token})
+        self.assertTrue(stored.name.endswith('.pdf'))
+        self.assertEqual(storage.open(stored.name).read(), content)
+        # The completed upload was moved into place and its token used up.
+        self.assertFalse(os.path.exists(self.store.get_path(token)))
+        self.assertFalse(os.path.exists(self.store.get_path(token, 'json')))
+        with self.assertRaises(ValidationError):
+            field.to_internal_value({'upload_token': token})
+
+        # Uploads left for the model field to save can't be used again either.
+        token = self.upload(content)
+        field = PDFResumableFileField(upload_store=self.store)
+        upload = field.to_internal_value({'upload_token': token})
+        self.addCleanup(upload.close)
+        self.assertEqual(upload.read(), content)
+        self.assertTrue(os.path.exists(self.store.get_path(token)))
+        with self.assertRaises(ValidationError):
+            field.to_internal_value({'upload_token': token})
+
+        self.assertEqual(
+            PDFResumableFileField().get_upload_store(), uploads.default_store)
+        self.assertIsNotNone(field.to_internal_value(base64.b64encode(content).decode()))
+
+    def test_field_invalid(self):
+        """
+        Incomplete or disallowed uploads are rejected.
+        """
+        field = PDFResumableFileField(upload_store=self.store, max_decoded_size=20)
+        token = self.store.create(10)
+        for token in (token, 'abc', None):
+            with self.assertRaises(ValidationError) as exc_info:
+                field.to_internal_value({'upload_token': token})
+            self.assertEqual(
+                exc_info.exception.messages, ["The upload doesn't exist or isn't complete."])
+
+        with self.assertRaises(ValidationError) as exc_info:
+            field.to_internal_value({'upload_token': self.upload(b'0' * 21)})
+        self.assertEqual(
+            exc_info.exception.messages, ['The file may not be larger than 20 bytes.'])
+        with self.assertRaises(ValidationError) as exc_info:
+            field.to_internal_value({'upload_token': self.upload(b'GIF89a')})
+        self.assertEqual(
+            exc_info.exception.messages, ["The type of the file couldn't be determined."])
+
+        # Completed uploads are closed when their validation fails.
+        token = self.upload(b'%PDF-1.4\n%%EOF\n')
+        opened = []
+        store_open = self.store.open
+        with patch.object(self.store, 'open', side_effect=lambda token: opened.append(
+                store_open(token)) or opened[-1]):
+            with patch.object(field, 'validate_file', side_effect=ValidationError('invalid')):
+                with self.assertRaises(ValidationError):
+                    field.to_internal_value({'upload_token': token})
+        self.assertTrue(opened[0].closed)
+
+    def test_image_field(self):
+        """
+        Uploaded images are content addressed and rendered like base64 ones.
+        """
+        storage = FileSystemStorage(location=os.path.join(self.location, 'media'))
+        field = uploads.ResumableBase64ImageField(
+            upload_store=self.store, content_addressed=True, storage=storage,
+            renditions=[Rendition('thumb', (4, 4))])
+        image = field.to_internal_value(
+            {'upload_token': self.upload(make_image(), chunk_size=10)})
+        self.assertEqual(storage.open(image.name).read(), make_image())
+        self.assertFalse(storage.exists('renditions'))
+        field.make_renditions(image)
+        self.assertTrue(storage.exists('renditions/{0}/thumb.png'.format(
+            os.path.splitext(image.name)[0])))
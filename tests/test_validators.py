@@ -0,0 +1,118 @@
+import datetime
+import unittest
+
+from django.test import TestCase
+
+from rest_framework import serializers
+
+from drf_extra_fields import compat
+from drf_extra_fields import validators
+from drf_extra_fields.fields import IntegerRangeField, RangeListField
+
+
+def numeric_ranges(*values):
+    return [compat.NumericRange(*value) for value in values]
+
+
+@unittest.skipIf(compat.NumericRange is None, 'psycopg2 is not installed')
+class RangeValidatorTests(TestCase):
+
+    def assertValid(self, validator, values):
+        validator(values)
+
+    def assertInvalid(self, validator, values, message):
+        with self.assertRaises(serializers.ValidationError) as exc_info:
+            validator(values)
+        self.assertEqual(exc_info.exception.detail, [message])
+
+    def test_do_not_overlap(self):
+        """
+        Ranges may meet but not share values.
+        """
+        validator = validators.RangesDoNotOverlap()
+        message = 'The ranges may not overlap.'
+        self.assertValid(validator, [])
+        self.assertValid(validator, numeric_ranges(
+            (5, 7), (1, 3), (3, 5), (None, 1), (7, None), (0, 0, '()')))
+        self.assertValid(validator, numeric_ranges((1, 2, '[]'), (2, 3, '(]')))
+        self.assertInvalid(validator, numeric_ranges((1, 2, '[]'), (2, 3, '[]')), message)
+        self.assertInvalid(validator, numeric_ranges((5, 7), (1, 10), (8, 9)), message)
+        self.assertInvalid(validator, numeric_ranges((None, 1), (None, 2)), message)
+        self.assertInvalid(validator, numeric_ranges((1, None), (8, 9)), message)
+
+        # (1,2) has no integers and [1,2] meets [3,4].
+        validator = validators.RangesDoNotOverlap(step=1, message='Overlap.')
+        self.assertValid(validator, numeric_ranges((1, 2, '()'), (1, 3), (3, 4, '[]')))
+        self.assertInvalid(validator, numeric_ranges((1, 3, '[]'), (3, 4)), 'Overlap.')
+
+    def test_within(self):
+        """
+        Ranges may not reach beyond their parent.
+        """
+        validator = validators.RangesWithin(compat.NumericRange(0, 10))
+        message = 'The ranges must be within [0,10).'
+        self.assertValid(validator, numeric_ranges((0, 10), (2, 3, '[]'), (5, 5, '()')))
+        for values in ((-1, 5), (5, 10, '[]'), (None, 5), (5, None)):
+            self.assertInvalid(validator, numeric_ranges(values), message)
+        self.assertValid(validators.RangesWithin(
+            compat.NumericRange(0, 10), step=1), numeric_ranges((-1, 9, '(]')))
+
+        validator = validators.RangesWithin(compat.NumericRange(0, None, '(]'))
+        self.assertValid(validator, numeric_ranges((0, None, '()')))
+        self.assertInvalid(
+            validator, numeric_ranges((0, 1)), 'The ranges must be within (0,).')
+        validator = validators.RangesWithin(compat.NumericRange(empty=True))
+        self.assertValid(validator, [])
+        self.assertInvalid(
+            validator, numeric_ranges((0, 1)), 'The ranges must be within empty.')
+
+    def test_max_coverage(self):
+        """
+        Values covered by several ranges count once.
+        """
+        validator = validators.MaxRangeCoverage(5)
+        message = 'The ranges may not cover more than 5 in total.'
+        self.assertValid(validator, [])
+        self.assertValid(validator, numeric_ranges((0, 3), (1, 2), (10, 12)))
+        self.assertInvalid(validator, numeric_ranges((0, 3), (10, 13)), message)
+        self.assertInvalid(validator, numeric_ranges((0, None)), message)
+        self.assertInvalid(validator, numeric_ranges((None, 0)), message)
+        self.assertInvalid(
+            validators.MaxRangeCoverage(5, step=1), numeric_ranges((0, 5, '[]')), message)
+
+        validator = validators.MaxRangeCoverage(datetime.timedelta(hours=2))
+        start = datetime.datetime(2001, 1, 1)
+        hour = datetime.timedelta(hours=1)
+        self.assertValid(validator, [compat.DateTimeTZRange(start, start + hour),
+                                     compat.DateTimeTZRange(start + hour, start + 2 * hour)])
+        self.assertInvalid(validator, [compat.DateTimeTZRange(start, start + 3 * hour)], (
+            'The ranges may not cover more than 2:00:00 in total.'))
+
+    def test_field(self):
+        """
+        The validators work on range list fields.
+        """
+        field = RangeListField(
+            child=IntegerRangeField(), validators=[validators.RangesDoNotOverlap()])
+        self.assertEqual(field.run_validation([{'lower': 1, 'upper': 2}]), numeric_ranges((1, 2)))
+        with self.assertRaises(serializers.ValidationError):
+            field.run_validation([{'lower': 1, 'upper': 3}, {'lower': 2}])
+
+    def test_null_items(self):
+        """
+        Null items of fields with `allow_null` children are left out.
+        """
+        value = [None] + numeric_ranges((1, 3))
+        self.assertValid(validators.RangesDoNotOverlap(step=1), value)
+        self.assertValid(validators.RangesWithin(compat.NumericRange(0, 5)), value)
+        self.assertValid(validators.MaxRangeCoverage(2, step=1), value)
+        self.assertInvalid(
+            validators.MaxRangeCoverage(1, step=1), value,
+            'The ranges may not cover more than 1 in total.')
+
+        field = RangeListField(
+            child=IntegerRangeField(allow_null=True),
+            validators=[validators.RangesDoNotOverlap(step=1), validators.MaxRangeCoverage(2)])
+        self.assertEqual(
+            field.run_validation([None, {'lower': 1, 'upper': 3}]),
+            [None] + numeric_ranges((1, 3)))